@@ -0,0 +1,109 @@
+import pygame
+from settings import image_sizes
+
+def is_opaque(image):
+    """Sprawdza, czy obraz nie ma żadnego przezroczystego piksela"""
+    if image.get_colorkey() is not None:
+        return False
+    if not image.get_flags() & pygame.SRCALPHA:
+        return True
+    # arkusze sprite'ów prawie zawsze mają przezroczysty róg, wtedy nie liczymy całej maski
+    width, height = image.get_size()
+    if any(image.get_at(corner).a < 255 for corner in ((0, 0), (width - 1, 0), (0, height - 1), (width - 1, height - 1))):
+        return False
+    return pygame.mask.from_surface(image, 254).count() == width * height
+
+class AssetManager:
+    """
+    Klasa odpowiedzialna za wczytywanie obrazów i czcionek gry. Każdy plik jest dekodowany z dysku
+    tylko raz, a gotowe (przeskalowane i przekonwertowane) powierzchnie trzymamy w pamięci.
+    """
+
+    def __init__(self) -> None:
+        # surowe obrazy prosto z dysku, klucz: ścieżka
+        self.sources = {}
+        # gotowe obrazy, klucz: (ścieżka, rozmiar, tryb konwersji)
+        self.images = {}
+        # czy obraz nie ma przezroczystych pikseli, klucz: ścieżka
+        self.opaque = {}
+
+        self.hits = 0
+        self.misses = 0
+
+        # czcionki, klucz: (plik, rozmiar)
+        self.fonts = {}
+        self.font_hits = 0
+        self.font_misses = 0
+
+    def load_source(self, path):
+        """Zwraca obraz wczytany z dysku bez żadnych zmian (plik czytany jest tylko raz)"""
+        if path not in self.sources:
+            self.sources[path] = pygame.image.load(path)
+        return self.sources[path]
+
+    def add_source(self, path, image):
+        """Dodaje obraz zdekodowany gdzie indziej (np. w tle przez Preloader), load_image nie czyta już pliku"""
+        self.sources.setdefault(path, image)
+
+    def load_image(self, path, scale=None, convert='auto'):
+        """
+        Zwraca obraz z pamięci podręcznej, a jeżeli go tam nie ma to wczytuje go, konwertuje
+        do formatu ekranu i skaluje do podanego rozmiaru. convert: 'auto' (z kanałem alfa tylko
+        wtedy, gdy obraz ma przezroczyste piksele), 'alpha' albo 'opaque'.
+        Zwrócona powierzchnia jest współdzielona, więc nie wolno po niej rysować.
+        """
+        key = (path, scale, convert)
+        if key in self.images:
+            self.hits += 1
+            return self.images[key]
+
+        self.misses += 1
+        image = self.load_source(path)
+        # bez okna (tryb headless) nie ma formatu ekranu, obraz zostaje w formacie pliku
+        if pygame.display.get_surface():
+            if convert == 'auto':
+                if path not in self.opaque:
+                    self.opaque[path] = is_opaque(image)
+                convert = 'opaque' if self.opaque[path] else 'alpha'
+            if convert == 'alpha':
+                image = image.convert_alpha()
+            else:
+                image = image.convert()
+        if scale:
+            image = pygame.transform.scale(image, scale)
+
+        self.images[key] = image
+        return image
+
+    def image(self, path):
+        """Obraz w rozmiarze z tabeli image_sizes w settings.py (KeyError, jeżeli obrazu nie ma w tabeli)"""
+        return self.load_image(path, image_sizes[path])
+
+    def load_font(self, path, size):
+        """Zwraca czcionkę (path=None to domyślna czcionka pygame), każda para (plik, rozmiar) jest tworzona raz"""
+        key = (path, size)
+        if key in self.fonts:
+            self.font_hits += 1
+            return self.fonts[key]
+
+        self.font_misses += 1
+        self.fonts[key] = pygame.font.Font(path, size)
+        return self.fonts[key]
+
+    def stats(self):
+        """Zwraca liczniki trafień i chybień pamięci podręcznej"""
+        return {'hits': self.hits, 'misses': self.misses, 'sources': len(self.sources), 'images': len(self.images),
+                'font_hits': self.font_hits, 'font_misses': self.font_misses, 'fonts': len(self.fonts)}
+
+    def clear(self):
+        self.sources.clear()
+        self.images.clear()
+        self.opaque.clear()
+        self.fonts.clear()
+        self.hits = 0
+        self.misses = 0
+        self.font_hits = 0
+        self.font_misses = 0
+
+# wspólna instancja, przez którą wszystkie klasy pobierają obrazy i czcionki
+assets = AssetManager()
@@ -0,0 +1,224 @@
+import weakref
+import pygame
+from collections import OrderedDict
+from settings import *
+from assets import assets
+from framecache import frame_cache
+
+def frame_rects(row, count, size, offset=0, stride=None):
+    """Zwraca prostokąty kolejnych klatek z jednego rzędu arkusza (stride - odstęp między klatkami w pikselach)"""
+    width, height = size
+    stride = stride or width
+    return [(offset + i * stride, row * height, width, height) for i in range(count)]
+
+def view(sheet, rect):
+    """Fragment arkusza jako subsurface, a jeżeli prostokąt wychodzi poza arkusz - kopia z przezroczystym brzegiem"""
+    rect = pygame.Rect(rect)
+    if sheet.get_rect().contains(rect):
+        return sheet.subsurface(rect)
+    image = pygame.Surface(rect.size, pygame.SRCALPHA)
+    image.blit(sheet, (0, 0), rect)
+    return image
+
+class Frames(list):
+    """Klatki jednej animacji (podklasa list, bo do zwykłej listy nie da się utworzyć słabej referencji)"""
+    __slots__ = ('__weakref__', 'size')
+
+class TextureAtlas:
+    """
+    Atlas tekstur. Na strony (powierzchnie o boku page_size, pakowane półkami, rząd obok rzędu)
+    trafiają tylko ikony HUD. Klatki animacji nie są pakowane na strony: klatki bez przekształceń
+    są widokami na arkusz, a przekształcone leżą na jednym pasku na animację, który LRU może zwolnić
+    w całości. Animacje są dostępne przez (arkusz, animacja, numer klatki), wycinane dopiero przy
+    pierwszym użyciu i trzymane w pamięci LRU z limitem bajtów, a wszystkie sprite'y tego samego
+    typu korzystają z tych samych powierzchni.
+    """
+
+    def __init__(self, page_size=ICON_PAGE_SIZE, budget=ANIMATION_CACHE_BYTES) -> None:
+        self.page_size = page_size
+        self.icon_pages = []
+        # strona, na którą obecnie pakujemy ikony, i jej półki: [y, wysokość, zajęta szerokość]
+        self.icon_page = None
+        self.shelves = []
+        # ikony spakowane na strony, klucz: ścieżka
+        self.images = {}
+
+        # przepisy animacji: (prostokąty, skala, odbicie, obrót), klucz: (arkusz, animacja)
+        self.specs = {}
+        # wycięte animacje w kolejności użycia (LRU), klucz: (arkusz, animacja)
+        self.loaded = OrderedDict()
+        self.loaded_bytes = 0
+        self.budget = budget
+        # animacje, które wypadły z LRU, ale wciąż trzyma je jakiś sprite
+        self.alive = weakref.WeakValueDictionary()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def new_surface(self, size):
+        surface = pygame.Surface(size, pygame.SRCALPHA)
+        if pygame.display.get_surface():
+            surface = surface.convert_alpha()
+        return surface
+
+    def new_icon_page(self, size):
+        page = self.new_surface(size)
+        self.icon_pages.append(page)
+        return page
+
+    def place_icon(self, width, height):
+        """Znajduje miejsce na ikonę, zwraca (strona, x, y)"""
+        if width > self.page_size or height > self.page_size:
+            # obraz większy od strony dostaje własną stronę, bieżąca strona zostaje bez zmian
+            return self.new_icon_page((width, height)), 0, 0
+
+        if self.icon_page:
+            for shelf in self.shelves:
+                y, shelf_height, used = shelf
+                if height <= shelf_height and used + width <= self.page_size:
+                    shelf[2] += width
+                    return self.icon_page, used, y
+            top = self.shelves[-1][0] + self.shelves[-1][1]
+            if top + height <= self.page_size:
+                self.shelves.append([top, height, width])
+                return self.icon_page, 0, top
+
+        self.icon_page = self.new_icon_page((self.page_size, self.page_size))
+        self.shelves = [[0, height, width]]
+        return self.icon_page, 0, 0
+
+    def pack_icon(self, image):
+        """Kopiuje ikonę na stronę atlasu i zwraca jej fragment (subsurface strony)"""
+        width, height = image.get_size()
+        page, x, y = self.place_icon(width, height)
+        # strona jest przezroczysta, więc BLEND_RGBA_MAX kopiuje piksele bez mieszania
+        page.blit(image, (x, y), special_flags=pygame.BLEND_RGBA_MAX)
+        return page.subsurface((x, y, width, height))
+
+    def sheet(self, sheet):
+        """Arkusz z cache na dysku, a jeżeli go tam nie ma - wczytany z PNG"""
+        image = frame_cache.get(sheet, "sheet")
+        if image is None:
+            image = assets.image(sheet)
+            frame_cache.add(sheet, "sheet", image)
+        return image
+
+    def cut_animation(self, sheet, rects, scale=None, flip=False, rotate=0):
+        """
+        Wycina klatki animacji. Klatki bez przekształceń to widoki (subsurface) na arkusz, bez kopiowania
+        pikseli. Przeskalowane, odbite albo obrócone są wczytywane gotowe z cache na dysku,
+        a brakujące tworzymy i kopiujemy obok siebie na jeden pasek, który można zwolnić w całości.
+        """
+        if not (scale or flip or rotate):
+            frames = Frames(view(self.sheet(sheet), rect) for rect in rects)
+            frames.size = 0
+            return frames
+
+        images = []
+        missing = []
+        for index, rect in enumerate(rects):
+            frame_key = repr((tuple(rect), scale, flip, rotate))
+            image = frame_cache.get(sheet, frame_key)
+            if image is None:
+                image = view(self.sheet(sheet), rect)
+                if scale:
+                    image = pygame.transform.scale(image, scale)
+                if flip:
+                    image = pygame.transform.flip(image, True, False)
+                if rotate:
+                    image = pygame.transform.rotate(image, rotate)
+                missing.append((index, frame_key))
+            images.append(image)
+
+        if missing:
+            strip = self.new_surface((sum(images[index].get_width() for index, _ in missing), max(images[index].get_height() for index, _ in missing)))
+            x = 0
+            for index, frame_key in missing:
+                width, height = images[index].get_size()
+                # pasek jest przezroczysty, więc BLEND_RGBA_MAX kopiuje piksele bez mieszania
+                strip.blit(images[index], (x, 0), special_flags=pygame.BLEND_RGBA_MAX)
+                images[index] = strip.subsurface((x, 0, width, height))
+                frame_cache.add(sheet, frame_key, images[index])
+                x += width
+
+        frames = Frames(images)
+        frames.size = sum(image.get_width() * image.get_height() * 4 for image in images)
+        return frames
+
+    def define(self, sheet, animation, rects, scale=None, flip=False, rotate=0):
+        """Zapisuje przepis na animację (prostokąty klatek i przekształcenia) bez wycinania klatek"""
+        self.specs.setdefault((sheet, animation), (rects, scale, flip, rotate))
+
+    def animation(self, sheet, animation, rects=None, scale=None, flip=False, rotate=0):
+        """
+        Zwraca listę klatek animacji, wycinając ją przy pierwszym użyciu (z prostokątów rects,
+        np. z frame_rects(), albo z przepisu zapisanego przez define()). Wycięte animacje są trzymane
+        w pamięci LRU ograniczonej do budget bajtów, najdawniej używane są zwalniane.
+        """
+        key = (sheet, animation)
+        if key in self.loaded:
+            self.hits += 1
+            self.loaded.move_to_end(key)
+            return self.loaded[key]
+
+        if rects is not None:
+            self.define(sheet, animation, rects, scale, flip, rotate)
+        # animacja usunięta z LRU, której jakiś sprite wciąż używa, nie jest wycinana ponownie
+        frames = self.alive.get(key)
+        if frames is None:
+            self.misses += 1
+            frames = self.cut_animation(sheet, *self.specs[key])
+            self.alive[key] = frames
+
+        self.loaded[key] = frames
+        self.loaded_bytes += frames.size
+        self.evict()
+        return frames
+
+    def evict(self):
+        # zostawiamy przynajmniej ostatnio użytą animację, nawet jeżeli sama przekracza budżet
+        while self.loaded_bytes > self.budget and len(self.loaded) > 1:
+            _, frames = self.loaded.popitem(last=False)
+            self.loaded_bytes -= frames.size
+            self.evictions += 1
+
+    def frame(self, sheet, animation, index):
+        return self.animation(sheet, animation)[index]
+
+    def image(self, path):
+        """Cały obraz (ikona HUD, w rozmiarze z image_sizes) spakowany na stronę atlasu"""
+        if path not in self.images:
+            self.images[path] = self.pack_icon(assets.image(path))
+        return self.images[path]
+
+    def stats(self):
+        return {'icon_pages': len(self.icon_pages), 'images': len(self.images), 'animations': len(self.specs),
+                'loaded': len(self.loaded), 'loaded_bytes': self.loaded_bytes, 'budget': self.budget,
+                'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+
+class Animations:
+    """
+    Słownik animacji jednego arkusza, który niczego nie wycina z góry. add() zapisuje tylko przepis,
+    a klatki są pobierane z atlasu przy użyciu danej animacji (atlas może je potem zwolnić).
+    """
+
+    def __init__(self, sheet) -> None:
+        self.sheet = sheet
+        self.names = []
+
+    def add(self, name, rects, scale=None, flip=False, rotate=0):
+        atlas.define(self.sheet, name, rects, scale, flip, rotate)
+        self.names.append(name)
+
+    def __getitem__(self, name):
+        return atlas.animation(self.sheet, name)
+
+    def __contains__(self, name):
+        return name in self.names
+
+    def __iter__(self):
+        return iter(self.names)
+
+# wspólna instancja dla całej gry
+atlas = TextureAtlas()
@@ -0,0 +1,107 @@
+import os
+import pygame
+from settings import *
+
+class AudioEngine:
+    """
+    Klasa odpowiedzialna za efekty głosowe. Wszystkie pliki z sounds/effects są dekodowane
+    raz przy starcie gry, a kanały miksera są przydzielane z puli według priorytetu.
+    """
+
+    def __init__(self, path=SOUND_EFFECTS_PATH, voice_count=VOICE_COUNT) -> None:
+        self.path = path
+        self.voice_count = voice_count
+
+        self.sounds = {}
+        # jeden wpis na kanał: jaki dźwięk na nim gra, z jakim priorytetem i kiedy został włączony
+        self.voices = []
+        self.play_count = 0
+        self.stolen = 0
+        # wstrzymane dźwięki (gra w tle), nowe efekty nie są wtedy odtwarzane
+        self.paused = False
+        # bez dźwięku (tryb headless) mikser nie jest w ogóle uruchamiany
+        self.enabled = True
+
+    def load(self):
+        """Dekoduje wszystkie efekty i przygotowuje pulę kanałów"""
+        pygame.mixer.set_num_channels(self.voice_count)
+        self.voices = [{'channel': pygame.mixer.Channel(i), 'name': None, 'priority': 0, 'order': 0} for i in range(self.voice_count)]
+
+        for file in sorted(os.listdir(self.path)):
+            name, extension = os.path.splitext(file)
+            if extension.lower() not in ('.ogg', '.wav', '.mp3'):
+                continue
+            sound = pygame.mixer.Sound(os.path.join(self.path, file))
+            sound.set_volume(sound_data.get(name, {}).get('volume', 1))
+            self.sounds[name] = sound
+
+    def find_voice(self, priority):
+        # wolny kanał ma pierwszeństwo
+        for voice in self.voices:
+            if not voice['channel'].get_busy():
+                return voice
+
+        # pula jest pełna, więc zabieramy najstarszy kanał o najniższym priorytecie,
+        # ale tylko jeżeli jego priorytet nie jest wyższy od nowego dźwięku
+        candidates = [voice for voice in self.voices if voice['priority'] <= priority]
+        if not candidates:
+            return None
+        self.stolen += 1
+        return min(candidates, key=lambda voice: (voice['priority'], voice['order']))
+
+    def play(self, name, priority=None):
+        """
+        Odtwarza efekt i zwraca numer tego odtworzenia, którym można go potem zatrzymać przez stop()
+        (albo None, jeżeli dźwięk nie gra: dźwięk wyłączony, wstrzymany albo zabrakło kanału)
+        """
+        if not self.enabled or self.paused:
+            return None
+        if not self.sounds:
+            self.load()
+        if priority is None:
+            priority = sound_data.get(name, {}).get('priority', 0)
+
+        voice = self.find_voice(priority)
+        if voice is None:
+            return None
+
+        self.play_count += 1
+        voice['channel'].play(self.sounds[name])
+        voice['name'] = name
+        voice['priority'] = priority
+        voice['order'] = self.play_count
+        return self.play_count
+
+    def pause(self):
+        """Wstrzymuje wszystkie kanały i muzykę"""
+        self.paused = True
+        pygame.mixer.pause()
+        pygame.mixer.music.pause()
+
+    def resume(self):
+        self.paused = False
+        pygame.mixer.unpause()
+        pygame.mixer.music.unpause()
+
+    def is_playing(self, name):
+        return any(voice['name'] == name and voice['channel'].get_busy() for voice in self.voices)
+
+    def stop(self, name, play):
+        """
+        Zatrzymuje jedno odtworzenie efektu (play - numer zwrócony przez play()). Jeżeli kanał został
+        w międzyczasie zabrany innemu dźwiękowi (także tej samej nazwy) albo play to None, nic nie robi.
+        """
+        if play is None:
+            return
+        for voice in self.voices:
+            if voice['order'] == play and voice['name'] == name and voice['channel'].get_busy():
+                voice['channel'].stop()
+
+    def stop_all(self, name):
+        """Zatrzymuje dany efekt na wszystkich kanałach"""
+        for voice in self.voices:
+            if voice['name'] == name:
+                voice['channel'].stop()
+
+# wspólna instancja dla całej gry
+audio = AudioEngine()
@@ -0,0 +1,71 @@
+import atexit
+import sys
+import pygame
+
+def same_format(target, source):
+    """Czy blit ze source na target nie wymaga przeliczania każdego piksela na inny format"""
+    return source.get_bytesize() == target.get_bytesize() and source.get_masks()[:3] == target.get_masks()[:3]
+
+def describe(surface):
+    alpha = 'alpha' if surface.get_flags() & pygame.SRCALPHA else 'opaque'
+    return f"{surface.get_bitsize()}bit {alpha} masks={tuple(hex(mask) for mask in surface.get_masks())}"
+
+class FormatAudit:
+    """
+    Tryb debugowania (FORMAT_AUDIT w settings.py): zapisuje każdy blit, w którym format
+    obrazu źródłowego nie pasuje do formatu celu, razem z miejscem w kodzie, z którego go wywołano.
+    Po włączeniu gra rysuje do bufora o formacie okna, który przed wysłaniem klatki jest
+    kopiowany do okna, a powierzchnie tworzone przez pygame.Surface(...) są sprawdzane tak samo.
+    """
+
+    def __init__(self) -> None:
+        # klucz: (plik, linia), wartość: liczba blitów i opis formatów
+        self.records = {}
+        self.installed = False
+
+    def record(self, target, source):
+        if same_format(target, source):
+            return
+        frame = sys._getframe(2)
+        key = (frame.f_code.co_filename, frame.f_lineno)
+        if key not in self.records:
+            self.records[key] = {'count': 0, 'source': describe(source), 'target': describe(target)}
+        self.records[key]['count'] += 1
+
+    def install(self):
+        """Włącza sprawdzanie i zwraca powierzchnię, na której od teraz trzeba rysować zamiast okna"""
+        window = pygame.display.get_surface()
+        back_buffer = AuditedSurface(window.get_size(), 0, window)
+
+        update = pygame.display.update
+        def audited_update(*args):
+            window.blit(back_buffer, (0, 0))
+            update(*args)
+
+        pygame.display.get_surface = lambda: back_buffer
+        pygame.display.update = audited_update
+        pygame.Surface = AuditedSurface
+        atexit.register(self.report)
+        self.installed = True
+        return back_buffer
+
+    def report(self):
+        print(f"format audit: {len(self.records)} call sites with mismatched blits")
+        for (filename, line), record in sorted(self.records.items(), key=lambda item: -item[1]['count']):
+            print(f"  {filename}:{line} x{record['count']}  {record['source']} -> {record['target']}")
+
+class AuditedSurface(pygame.Surface):
+    """Powierzchnia, której blit() i blits() zgłaszają niepasujące formaty do format_audit"""
+
+    def blit(self, source, *args, **kwargs):
+        format_audit.record(self, source)
+        return super().blit(source, *args, **kwargs)
+
+    def blits(self, blit_sequence, *args, **kwargs):
+        blit_sequence = list(blit_sequence)
+        for item in blit_sequence:
+            format_audit.record(self, item[0])
+        return super().blits(blit_sequence, *args, **kwargs)
+
+# wspólna instancja, włączana w Game.__init__
+format_audit = FormatAudit()
@@ -0,0 +1,31 @@
+# pomiar: rysowanie sprite'ów pojedynczymi blit() i jednym blits() na warstwę
+# (tylko same wywołania rysujące, pozycje względem kamery są policzone wcześniej)
+# uruchomienie: python src/bench_blits.py
+import random
+from timeit import timeit
+import pygame
+from settings import *
+
+if __name__ == "__main__":
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGTH))
+    image = pygame.Surface((TILESIZE, TILESIZE), pygame.SRCALPHA).convert_alpha()
+    image.fill((200, 50, 50, 128))
+
+    random.seed(0)
+    print(f"{'sprites':>10} {'blit per sprite (ms)':>22} {'batched blits (ms)':>20}")
+    for count in (100, 1000, 10000):
+        # pary (obraz, pozycja na ekranie), tak jak w buforze YSortCameraGroup.draw_layer()
+        buffer = [(image, (random.randrange(-TILESIZE, WIDTH), random.randrange(-TILESIZE, HEIGTH))) for _ in range(count)]
+
+        def per_sprite():
+            for sprite_image, pos in buffer:
+                screen.blit(sprite_image, pos)
+
+        def batched():
+            screen.blits(buffer)
+
+        runs = 20
+        per_sprite_time = timeit(per_sprite, number=runs) / runs * 1000
+        batched_time = timeit(batched, number=runs) / runs * 1000
+        print(f"{count:>10} {per_sprite_time:>22.3f} {batched_time:>20.3f}")
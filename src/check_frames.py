@@ -0,0 +1,59 @@
+# sprawdzenie: klatki z atlasu (widoki na arkusz, paski, cache na dysku) wyglądają tak samo
+# jak klatki wycięte po staremu, czyli skopiowane z arkusza do osobnej powierzchni i przekształcone
+# uruchomienie: python src/check_frames.py
+import hashlib
+import sys
+import pygame
+from settings import *
+from assets import assets
+
+def explicit_copy(sheet, rect, scale=None, flip=False, rotate=0):
+    """Klatka wycięta tak, jak przed widokami: kopia fragmentu arkusza, potem przekształcenia"""
+    image = pygame.Surface(rect[2:], pygame.SRCALPHA)
+    image.blit(assets.load_image(sheet), (0, 0), rect)
+    if scale:
+        image = pygame.transform.scale(image, scale)
+    if flip:
+        image = pygame.transform.flip(image, True, False)
+    if rotate:
+        image = pygame.transform.rotate(image, rotate)
+    return image
+
+def rendered_hash(image):
+    """Skrót klatki narysowanej na nieprzezroczystym tle, tak jak trafia na ekran"""
+    background = pygame.Surface(image.get_size())
+    background.fill((91, 150, 80))
+    background.blit(image, (0, 0))
+    return hashlib.sha1(pygame.image.tobytes(background, "RGB")).hexdigest()
+
+if __name__ == "__main__":
+    pygame.init()
+    pygame.display.set_mode((WIDTH, HEIGTH))
+
+    from atlas import atlas
+    from level import Level
+    from projectile import Fireball, Laserbeam
+
+    # poziom i pociski we wszystkich kierunkach zapisują w atlasie przepisy wszystkich animacji
+    level = Level()
+    group = pygame.sprite.Group()
+    for facing in ("up", "down", "left", "right"):
+        Fireball((0, 0), [group], facing, level.obstacle_sprites, 1)
+        Laserbeam((0, 0), [group], facing, level.obstacle_sprites, 1)
+
+    checked = 0
+    mismatches = []
+    for (sheet, animation), (rects, scale, flip, rotate) in list(atlas.specs.items()):
+        frames = atlas.animation(sheet, animation)
+        if len(frames) != len(rects):
+            mismatches.append((sheet, animation, "frame count"))
+        for index, (frame, rect) in enumerate(zip(frames, rects)):
+            expected = explicit_copy(sheet, rect, scale, flip, rotate)
+            if frame.get_size() != expected.get_size() or rendered_hash(frame) != rendered_hash(expected):
+                mismatches.append((sheet, animation, index))
+            checked += 1
+
+    print(f"{len(atlas.specs)} animations, {checked} frames checked, {len(mismatches)} mismatches")
+    for mismatch in mismatches:
+        print("mismatch:", *mismatch)
+    sys.exit(1 if mismatches else 0)
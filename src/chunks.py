@@ -0,0 +1,70 @@
+import pygame
+from settings import *
+
+class ChunkLayer:
+    """
+    Warstwa mapy, która jest rysowana raz przy wczytaniu poziomu do kawałków (chunków)
+    o boku CHUNK_SIZE. W każdej klatce rysujemy tylko chunki widoczne przez kamerę.
+    """
+
+    def __init__(self, width=MAP_WIDTH, height=MAP_HEIGHT, chunk_size=CHUNK_SIZE, alpha=True) -> None:
+        self.width = width
+        self.height = height
+        self.chunk_size = chunk_size
+        self.alpha = alpha
+
+        # klucz: (kolumna, wiersz) chunka
+        self.chunks = {}
+        # obszar chunka, na którym faktycznie coś narysowano (puste piksele pomijamy przy rysowaniu)
+        self.bounds = {}
+
+    def get_chunk(self, col, row):
+        """Zwraca powierzchnię chunka, tworząc ją przy pierwszym użyciu"""
+        if (col, row) not in self.chunks:
+            width = min(self.chunk_size, self.width - col * self.chunk_size)
+            height = min(self.chunk_size, self.height - row * self.chunk_size)
+            if self.alpha:
+                chunk = pygame.Surface((width, height), pygame.SRCALPHA).convert_alpha()
+            else:
+                chunk = pygame.Surface((width, height)).convert()
+            self.chunks[(col, row)] = chunk
+        return self.chunks[(col, row)]
+
+    def chunk_range(self, rect):
+        """Zwraca zakres kolumn i wierszy chunków, które przecina dany prostokąt"""
+        first_col = max(0, rect.left // self.chunk_size)
+        first_row = max(0, rect.top // self.chunk_size)
+        last_col = min((self.width - 1) // self.chunk_size, (rect.right - 1) // self.chunk_size)
+        last_row = min((self.height - 1) // self.chunk_size, (rect.bottom - 1) // self.chunk_size)
+        return range(first_col, last_col + 1), range(first_row, last_row + 1)
+
+    def blit(self, image, pos):
+        """Wypala obraz w warstwie (w każdym chunku, na który zachodzi)"""
+        rect = image.get_rect(topleft=pos)
+        cols, rows = self.chunk_range(rect)
+        for row in rows:
+            for col in cols:
+                chunk = self.get_chunk(col, row)
+                drawn = chunk.blit(image, (rect.x - col * self.chunk_size, rect.y - row * self.chunk_size))
+                if (col, row) in self.bounds:
+                    drawn = drawn.union(self.bounds[(col, row)])
+                self.bounds[(col, row)] = drawn
+
+    def fill(self, image):
+        """Wypełnia całą warstwę powtarzanym obrazem (np. trawą)"""
+        tile_width, tile_height = image.get_size()
+        for y in range(0, self.height, tile_height):
+            for x in range(0, self.width, tile_width):
+                self.blit(image, (x, y))
+
+    def draw(self, surface, offset):
+        """Rysuje widoczne chunki na powierzchni, przesunięte o offset kamery"""
+        offset_x, offset_y = int(offset[0]), int(offset[1])
+        view = pygame.Rect(offset_x, offset_y, surface.get_width(), surface.get_height())
+        cols, rows = self.chunk_range(view)
+        for row in rows:
+            for col in cols:
+                chunk = self.chunks.get((col, row))
+                if chunk:
+                    bounds = self.bounds[(col, row)]
+                    surface.blit(chunk, (col * self.chunk_size + bounds.x - offset_x, row * self.chunk_size + bounds.y - offset_y), bounds)
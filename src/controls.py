@@ -0,0 +1,72 @@
+import atexit
+import time
+import pygame
+from settings import *
+
+# zdarzenia, od których liczymy opóźnienie wejścia
+INPUT_EVENTS = (pygame.KEYDOWN, pygame.KEYUP, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP)
+
+class Controls:
+    """
+    Stan klawiatury odczytany raz na krok symulacji. Gracz czyta klawisze stąd, a nie przez
+    pygame.key.get_pressed(), więc pętla gry decyduje, kiedy wejście jest próbkowane
+    (z LATE_INPUT tuż przed ostatnim krokiem symulacji w klatce, czyli jak najbliżej rysowania).
+    """
+
+    def __init__(self) -> None:
+        self.state = None
+        # kiedy odczytano klawisze i kiedy pętla odebrała pierwsze jeszcze nieobsłużone zdarzenie wejścia
+        self.sample_time = None
+        self.event_time = None
+
+    def handle(self, event):
+        if event.type in INPUT_EVENTS and self.event_time is None:
+            self.event_time = time.perf_counter()
+
+    def sample(self):
+        self.state = pygame.key.get_pressed()
+        self.sample_time = time.perf_counter()
+
+    @property
+    def keys(self):
+        if self.state is None:
+            self.sample()
+        return self.state
+
+class LatencyMeter:
+    """
+    Pomiar opóźnienia wejścia (LATENCY_STATS w settings.py): dla każdej klatki czas od odczytu
+    klawiszy użytych w symulacji do wysłania klatki do okna, a dla klatek po zdarzeniu
+    wejścia (naciśnięcie klawisza, kliknięcie) także czas od odebrania zdarzenia. Podsumowanie przy wyjściu.
+    """
+
+    def __init__(self, enabled=LATENCY_STATS) -> None:
+        self.enabled = enabled
+        self.sample_latency = []
+        self.event_latency = []
+        if enabled:
+            atexit.register(self.report)
+
+    def presented(self, sample_time, event_time=None):
+        """Wywoływane zaraz po wysłaniu klatki, czasy z time.perf_counter()"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if sample_time is not None:
+            self.sample_latency.append((now - sample_time) * 1000)
+        if event_time is not None:
+            self.event_latency.append((now - event_time) * 1000)
+
+    def summary(self, values):
+        if not values:
+            return "no frames"
+        values = sorted(values)
+        return f"avg {sum(values) / len(values):.2f} ms, p95 {values[int(len(values) * 0.95)]:.2f} ms, max {values[-1]:.2f} ms ({len(values)} frames)"
+
+    def report(self):
+        print(f"input sample to present: {self.summary(self.sample_latency)}")
+        print(f"input event to present: {self.summary(self.event_latency)}")
+
+# wspólne instancje dla pętli gry i gracza
+controls = Controls()
+latency = LatencyMeter()
@@ -0,0 +1,49 @@
+import pygame
+from settings import *
+
+class DirtyRects:
+    """
+    Zbiera prostokąty ekranu zmienione w danej klatce, tak żeby do okna wysyłać tylko je
+    (pygame.display.update(rects)) zamiast całego obrazu. Odświeżamy też prostokąty z poprzedniej
+    klatki, bo w miejscu, z którego coś zniknęło, widać teraz tło. Jeżeli zmienił się cały ekran
+    (np. przesunęła się kamera albo zmienił się ekran gry), wysyłamy całą klatkę.
+    """
+
+    def __init__(self, enabled=DIRTY_RECTS) -> None:
+        self.enabled = enabled
+        self.rects = []
+        self.previous = []
+        self.full = True
+
+        self.full_updates = 0
+        self.partial_updates = 0
+
+    def add(self, rect):
+        """Zgłasza prostokąt (we współrzędnych ekranu), na którym coś narysowano"""
+        if self.enabled:
+            self.rects.append(pygame.Rect(rect))
+
+    def extend(self, rects):
+        if self.enabled:
+            self.rects.extend(rects)
+
+    def invalidate(self):
+        """Następna klatka zostanie wysłana w całości"""
+        self.full = True
+
+    def present(self):
+        if not self.enabled or self.full:
+            pygame.display.update()
+            self.full_updates += 1
+        else:
+            screen_rect = pygame.display.get_surface().get_rect()
+            rects = [rect.clip(screen_rect) for rect in self.rects + self.previous]
+            pygame.display.update([rect for rect in rects if rect.width and rect.height])
+            self.partial_updates += 1
+
+        self.previous = self.rects
+        self.rects = []
+        self.full = False
+
+# wspólna instancja dla wszystkich etapów rysowania
+dirty_rects = DirtyRects()
@@ -1,34 +1,23 @@
 import pygame
 from settings import *
+from atlas import atlas, frame_rects
+from gameclock import game_clock
 
 class Portal(pygame.sprite.Sprite):
     def __init__(self, pos, groups):
         super().__init__(groups)
-        self.sprite_sheet = pygame.image.load("img/assets/portal.png").convert_alpha()
-        self.frames = self.load_frames()
+        self.collision_layer = LAYER_TERRAIN
+        self.frames = atlas.animation("img/assets/portal.png", "portal", frame_rects(0, 8, (64, 64)), scale=(128,128))
         self.current_frame = 0
         self.image = self.frames[self.current_frame]
         self.rect = self.image.get_rect(topleft=pos)
         self.hitbox = self.rect.inflate(-120,-70)
         self.hitbox.move_ip(0,10)
         self.animation_speed = 100  # ms between frames
-        self.last_update = pygame.time.get_ticks()
-
-    def load_frames(self):
-        frames = []
-        for i in range(8):
-            frame = self.get_sprite(self.sprite_sheet, i, 0, 64, 64)
-            frame = pygame.transform.scale(frame, (128,128))
-            frames.append(frame)
-        return frames
-
-    def get_sprite(self, sheet, x, y, width, height):
-        image = pygame.Surface((width, height), pygame.SRCALPHA)
-        image.blit(sheet, (0, 0), (x * width, y * height, width, height))
-        return image
+        self.last_update = game_clock.ticks()
 
     def update(self):
-        now = pygame.time.get_ticks()
+        now = game_clock.ticks()
         if now - self.last_update > self.animation_speed:
             self.last_update = now
             self.current_frame = (self.current_frame + 1) % len(self.frames)
@@ -38,32 +27,18 @@ class Portal(pygame.sprite.Sprite):
 class Water(pygame.sprite.Sprite):
     def __init__(self, pos, groups):
         super().__init__(groups)
-        self.sprite_sheet = pygame.image.load("img/assets/water-sheet.png").convert_alpha()
-        self.frames = self.load_frames()
+        self.collision_layer = LAYER_WATER
+        # klatki 45x45 są rozstawione co 80 pikseli
+        self.frames = atlas.animation("img/assets/water-sheet.png", "water", frame_rects(0, 6, (45, 45), stride=80))
         self.current_frame = 0
         self.image = self.frames[self.current_frame]
         self.rect = self.image.get_rect(topleft=pos)
         self.animation_speed = 100  # ms between frames
-        self.last_update = pygame.time.get_ticks()
+        self.last_update = game_clock.ticks()
         self.hitbox = self.rect.inflate(-20, -20)  #hitbox
 
-    def load_frames(self):
-        frames = []
-        frame_width = 45
-        frame_height = 45
-        spacing = 35
-        for i in range(6):
-            frame = self.get_sprite(self.sprite_sheet, i * (frame_width + spacing), 0, frame_width, frame_height)
-            frames.append(frame)
-        return frames
-
-    def get_sprite(self, sheet, x, y, width, height):
-        image = pygame.Surface((width, height), pygame.SRCALPHA)
-        image.blit(sheet, (0, 0), (x, y, width, height))
-        return image
-
     def update(self):
-        now = pygame.time.get_ticks()
+        now = game_clock.ticks()
         if now - self.last_update > self.animation_speed:
             self.last_update = now
             self.current_frame = (self.current_frame + 1) % len(self.frames)
@@ -73,31 +48,18 @@ class Water(pygame.sprite.Sprite):
 class bloodtower(pygame.sprite.Sprite):
     def __init__(self, pos, groups):
         super().__init__(groups)
-        self.sprite_sheet = pygame.image.load("img/assets/blood.png").convert_alpha()
-        self.frames = self.load_frames()
+        self.collision_layer = LAYER_TERRAIN
+        self.frames = atlas.animation("img/assets/blood.png", "tower", frame_rects(0, 8, (100, 140)), scale=(128,128))
         self.current_frame = 0
         self.image = self.frames[self.current_frame]
         self.rect = self.image.get_rect(topleft=pos)
         self.hitbox = self.rect.inflate(-120,-70)
         self.hitbox.move_ip(0,10)
         self.animation_speed = 100  # ms between frames
-        self.last_update = pygame.time.get_ticks()
-
-    def load_frames(self):
-        frames = []
-        for i in range(8):
-            frame = self.get_sprite(self.sprite_sheet, i, 0, 100, 140)
-            frame = pygame.transform.scale(frame, (128,128))
-            frames.append(frame)
-        return frames
-
-    def get_sprite(self, sheet, x, y, width, height):
-        image = pygame.Surface((width, height), pygame.SRCALPHA)
-        image.blit(sheet, (0, 0), (x * width, y * height, width, height))
-        return image
+        self.last_update = game_clock.ticks()
 
     def update(self):
-        now = pygame.time.get_ticks()
+        now = game_clock.ticks()
         if now - self.last_update > self.animation_speed:
             self.last_update = now
             self.current_frame = (self.current_frame + 1) % len(self.frames)
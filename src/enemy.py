@@ -1,15 +1,20 @@
 import pygame
 from settings import *
+from assets import assets
+from atlas import Animations, frame_rects
+from text import text_cache
+from gameclock import game_clock
 
 class Enemy(pygame.sprite.Sprite):
     def __init__(self, pos, groups, obstacle_sprites, visible_sprites, player, level, exp, level_instance):
         super().__init__(groups)
+        self.collision_layer = LAYER_ENEMY
         self.obstacle_sprites = obstacle_sprites
         self.visible_sprites = visible_sprites
         self.player = player
         self.alive = True
         self.dying = False
-        self.font = pygame.font.Font(None, 18)
+        self.font = assets.load_font(None, 18)
         self.exp = exp
         self.level = level
         self.level_instance = level_instance
@@ -17,36 +22,28 @@ class Enemy(pygame.sprite.Sprite):
         self.damage = self.base_damage * self.level
         
 
-    def draw_name(self, screen, offset):
-        # Rysowanie imienia i poziomu przeciwnika na ekranie
-        camera_pos = pygame.Vector2(self.rect.topleft) - offset
-        if self.alive:
-            # rysowanie nazwy
-            name_text = f"{self.name}"
-            name_surf = self.font.render(name_text, True, (255, 255, 255))
-            name_rect = name_surf.get_rect(center=(camera_pos.x + self.rect.width // 2, camera_pos.y + 1))  # Adjust y-offset for the name
+    # zwraca pary (powierzchnia, pozycja) z imieniem i poziomem, do rysowania razem z innymi sprite'ami
+    def name_blits(self, offset):
+        if not self.alive:
+            return []
+        camera_x = self.rect.x - offset[0]
+        camera_y = self.rect.y - offset[1]
 
-            # rysowanie poziomu
-            level_text = f"lvl {self.level}"
-            level_surf = self.font.render(level_text, True, (255, 255, 255))
-            level_rect = level_surf.get_rect(center=(camera_pos.x + self.rect.width // 2, camera_pos.y + 15))  # Adjust y-offset for the level below the name
+        # rysowanie nazwy
+        name_text = f"{self.name}"
+        name_surf = text_cache.render(self.font, name_text, True, (255, 255, 255))
+        name_rect = name_surf.get_rect(center=(camera_x + self.rect.width // 2, camera_y + 1))  # Adjust y-offset for the name
 
-            screen.blit(name_surf, name_rect)
-            screen.blit(level_surf, level_rect)
+        # rysowanie poziomu
+        level_text = f"lvl {self.level}"
+        level_surf = text_cache.render(self.font, level_text, True, (255, 255, 255))
+        level_rect = level_surf.get_rect(center=(camera_x + self.rect.width // 2, camera_y + 15))  # Adjust y-offset for the level below the name
 
-    def get_sprite(self, sheet, x, y, width, height, offset=0, scale=None, flip=False):
-        # Wycinanie pojedynczego sprite'a z arkusza sprite'ów
-        image = pygame.Surface((width, height), pygame.SRCALPHA)
-        image.blit(sheet, (0, 0), (x * width + offset, y * height, width, height))
-        if scale:
-            image = pygame.transform.scale(image, scale)
-        if flip:
-            image = pygame.transform.flip(image, True, False)
-        return image
-    
-    def create_animation(self, sheet, row, num_frames, width, height, scale=None, flip=False):
-        # Tworzenie animacji z szeregu klatek w arkuszu sprite'ów
-        return [self.get_sprite(sheet, i, row, width, height, scale=scale, flip=flip) for i in range(num_frames)]
+        return [(name_surf, name_rect), (level_surf, level_rect)]
+
+    def create_animation(self, name, row, num_frames, width, height, scale=None, flip=False):
+        # Animacja z szeregu klatek w arkuszu sprite'ów, atlas tekstur wycina ją dopiero przy pierwszym użyciu
+        self.animations.add(name, frame_rects(row, num_frames, (width, height)), scale=scale, flip=flip)
 
     def update_animation(self):
         # Aktualizacja klatki animacji
@@ -80,6 +77,7 @@ class Enemy(pygame.sprite.Sprite):
                 direction = direction.normalize()
             self.hitbox.center += direction * self.speed
             self.rect.center = self.hitbox.center
+            self.obstacle_sprites.move(self)
             self.set_move_animation(direction)
     
     def take_damage(self, amount):
@@ -105,7 +103,7 @@ class Enemy(pygame.sprite.Sprite):
         # Sprawdzanie, czy atak się powiódł
         if self.player.alive:
             if self.hitbox.colliderect(self.player.hitbox):
-                now = pygame.time.get_ticks()
+                now = game_clock.ticks()
                 if now - self.last_attack_time > self.attack_cooldown:
                     self.player.take_damage(self.attack_damage)
                     self.last_attack_time = now
@@ -117,8 +115,19 @@ class Skeleton(Enemy):
         self.base_health = 20
         self.base_damage = 5
         super().__init__(pos, groups, obstacle_sprites, visible_sprites, player, level, exp, level_instance)
-        self.sprite_sheet = pygame.image.load("img/assets/skeleton.png").convert_alpha()
-        self.image = self.get_sprite(self.sprite_sheet, 0, 0, skeleton_width, skeleton_height, scale=(80, 80))
+        self.sprite_sheet = "img/assets/skeleton.png"
+        self.animations = Animations(self.sprite_sheet)
+        self.create_animation("stand", 0, 6, skeleton_width, skeleton_height, scale=(80, 80))
+        self.create_animation("death", 12, 5, skeleton_width, skeleton_height, scale=(80, 80))
+        self.create_animation("move_top", 5, 6, skeleton_width, skeleton_height, scale=(80, 80))
+        self.create_animation("move_bottom", 3, 6, skeleton_width, skeleton_height, scale=(80, 80))
+        self.create_animation("move_right", 4, 6, skeleton_width, skeleton_height, scale=(80, 80))
+        self.create_animation("move_left", 4, 6, skeleton_width, skeleton_height, scale=(80, 80), flip=True)
+        self.create_animation("attack_right", 7, 6, skeleton_width, skeleton_height, scale=(80, 80))
+        self.create_animation("attack_left", 7, 6, skeleton_width, skeleton_height, scale=(80, 80), flip=True)
+        self.create_animation("attack_down", 6, 6, skeleton_width, skeleton_height, scale=(80, 80))
+        self.create_animation("attack_up", 8, 6, skeleton_width, skeleton_height, scale=(80, 80))
+        self.image = self.animations["stand"][0]
         self.rect = self.image.get_rect()
         self.rect.topleft = pos
         self.hitbox = self.rect.inflate(-50, -50)
@@ -128,27 +137,15 @@ class Skeleton(Enemy):
         self.attack_damage = self.damage
         self.attack_cooldown = 2000
         self.last_attack_time = 0
-        self.animations = {
-            "stand": self.create_animation(self.sprite_sheet, 0, 6, skeleton_width, skeleton_height, scale=(80, 80)),
-            "death": self.create_animation(self.sprite_sheet, 12, 5, skeleton_width, skeleton_height, scale=(80, 80)),
-            "move_top": self.create_animation(self.sprite_sheet, 5, 6, skeleton_width, skeleton_height, scale=(80, 80)),
-            "move_bottom": self.create_animation(self.sprite_sheet, 3, 6, skeleton_width, skeleton_height, scale=(80, 80)),
-            "move_right": self.create_animation(self.sprite_sheet, 4, 6, skeleton_width, skeleton_height, scale=(80, 80)),
-            "move_left": self.create_animation(self.sprite_sheet, 4, 6, skeleton_width, skeleton_height, scale=(80, 80), flip=True),
-            "attack_right": self.create_animation(self.sprite_sheet, 7, 6, skeleton_width, skeleton_height, scale=(80, 80)),
-            "attack_left": self.create_animation(self.sprite_sheet, 7, 6, skeleton_width, skeleton_height, scale=(80, 80), flip=True),
-            "attack_down": self.create_animation(self.sprite_sheet, 6, 6, skeleton_width, skeleton_height, scale=(80, 80)),
-            "attack_up": self.create_animation(self.sprite_sheet, 8, 6, skeleton_width, skeleton_height, scale=(80, 80))
-        }
         self.current_animation = self.animations["stand"]
         self.current_frame = 0
-        self.last_update_time = pygame.time.get_ticks()
+        self.last_update_time = game_clock.ticks()
         self.is_attacking = False
         self.animation_speed = 0.2
 
     def update(self):
         # Aktualizacja stanu szkieleta w każdej klatce gry
-        now = pygame.time.get_ticks()
+        now = game_clock.ticks()
         elapsed_time = (now - self.last_update_time) / 1000.0
         if elapsed_time > self.animation_speed:
             self.last_update_time = now
@@ -216,8 +213,12 @@ class Slime(Enemy):
         self.base_health = 20
         self.base_damage = 5
         super().__init__(pos, groups, obstacle_sprites, visible_sprites, player, level, exp, level_instance)
-        self.sprite_sheet = pygame.image.load("img/assets/slime.png").convert_alpha()
-        self.image = self.get_sprite(self.sprite_sheet, 0, 0, slime_width, slime_height, scale=(64, 64))
+        self.sprite_sheet = "img/assets/slime.png"
+        self.animations = Animations(self.sprite_sheet)
+        self.create_animation("stand", 0, 4, slime_width, slime_height, scale=(64, 64))
+        self.create_animation("death", 12, 5, slime_width, slime_height, scale=(64, 64))
+        self.create_animation("move", 6, 7, slime_width, slime_height, scale=(64, 64))
+        self.image = self.animations["stand"][0]
         self.rect = self.image.get_rect()
         self.rect.topleft = pos
         self.hitbox = self.rect.inflate(-40, -40)
@@ -227,15 +228,10 @@ class Slime(Enemy):
         self.attack_damage = self.damage
         self.attack_cooldown = 1000
         self.last_attack_time = 0
-        self.animations = {
-            "stand": self.create_animation(self.sprite_sheet, 0, 4, slime_width, slime_height, scale=(64, 64)),
-            "death": self.create_animation(self.sprite_sheet, 12, 5, slime_width, slime_height, scale=(64, 64)),
-            "move": self.create_animation(self.sprite_sheet, 6, 7, slime_width, slime_height, scale=(64, 64))
-        }
         self.animation_speed = slime_animation
         self.current_frame = 0
         self.current_animation = self.animations["stand"]
-        self.last_update_time = pygame.time.get_ticks()
+        self.last_update_time = game_clock.ticks()
 
     def set_move_animation(self, direction):
         # Ustawianie animacji ruchu slime'a
@@ -243,7 +239,7 @@ class Slime(Enemy):
 
     def update(self):
         # Aktualizacja stanu slime'a w każdej klatce gry
-        now = pygame.time.get_ticks()
+        now = game_clock.ticks()
         elapsed_time = (now - self.last_update_time) / 1000.0
         if elapsed_time > self.animation_speed:
             self.last_update_time = now
@@ -275,8 +271,16 @@ class Nightborne(Enemy):
         super().__init__(pos, groups, obstacle_sprites, visible_sprites, player, level, exp, level_instance)
         print(self.base_damage)
         print(self.base_health)
-        self.sprite_sheet = pygame.image.load("img/assets/night.png").convert_alpha()
-        self.image = self.get_sprite(self.sprite_sheet, 0, 0, nightborne_width, nightborne_height, scale=(140, 140))
+        self.sprite_sheet = "img/assets/night.png"
+        self.animations = Animations(self.sprite_sheet)
+        self.create_animation("stand", 0, 9, nightborne_width, nightborne_height, scale=(140, 140))
+        self.create_animation("move_right", 1, 6, nightborne_width, nightborne_height, scale=(140, 140))
+        self.create_animation("move_left", 1, 6, nightborne_width, nightborne_height, scale=(140, 140), flip=True)
+        self.create_animation("move_top", 1, 6, nightborne_width, nightborne_height, scale=(140, 140), flip=True)
+        self.create_animation("move_bottom", 1, 6, nightborne_width, nightborne_height, scale=(140, 140), flip=True)
+        self.create_animation("attack", 2, 12, nightborne_width, nightborne_height, scale=(140, 140))
+        self.create_animation("death", 4, 22, nightborne_width, nightborne_height, scale=(140, 140))
+        self.image = self.animations["stand"][0]
         self.rect = self.image.get_rect()
         self.rect.topleft = pos
         self.hitbox = self.rect.inflate(-10, -10)
@@ -286,25 +290,16 @@ class Nightborne(Enemy):
         self.attack_damage = self.damage
         self.attack_cooldown = 1300
         self.last_attack_time = 0
-        self.animations = {
-            "stand": self.create_animation(self.sprite_sheet, 0, 9, nightborne_width, nightborne_height, scale=(140, 140)),
-            "move_right": self.create_animation(self.sprite_sheet, 1, 6, nightborne_width, nightborne_height, scale=(140, 140)),
-            "move_left": self.create_animation(self.sprite_sheet, 1, 6, nightborne_width, nightborne_height, scale=(140, 140), flip=True),
-            "move_top": self.create_animation(self.sprite_sheet, 1, 6, nightborne_width, nightborne_height, scale=(140, 140), flip=True),
-            "move_bottom": self.create_animation(self.sprite_sheet, 1, 6, nightborne_width, nightborne_height, scale=(140, 140), flip=True),
-            "attack": self.create_animation(self.sprite_sheet, 2, 12, nightborne_width, nightborne_height, scale=(140, 140)),
-            "death": self.create_animation(self.sprite_sheet, 4, 22, nightborne_width, nightborne_height, scale=(140, 140))
-        }
         self.current_animation = self.animations["stand"]
         self.current_frame = 0
-        self.last_update_time = pygame.time.get_ticks()
+        self.last_update_time = game_clock.ticks()
         self.is_attacking = False
         self.animation_speed = 0.08
         self.death_animation_speed = 0.5
 
     def update(self):
         # Aktualizacja stanu Nightborne'a w każdej klatce gry
-        now = pygame.time.get_ticks()
+        now = game_clock.ticks()
         elapsed_time = (now - self.last_update_time) / 1000.0
         if elapsed_time > self.animation_speed:
             self.last_update_time = now
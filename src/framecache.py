@@ -0,0 +1,212 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import weakref
+import pygame
+from settings import *
+
+MAGIC = b"VFRM"
+VERSION = 1
+
+class FrameCache:
+    """
+    Pamięć podręczna gotowych klatek na dysku. Dla każdego arkusza zapisujemy jeden plik
+    z pikselami arkusza i jego przekształconych (przeskalowanych, odbitych, obróconych) klatek.
+    Nazwa pliku zawiera skrót zawartości PNG, więc zmiana obrazu unieważnia cache, oraz numer
+    wersji: każdy zapis tworzy nowy plik, bo pliku zmapowanego na Windowsie nie można nadpisać.
+    Przy starcie plik jest mapowany przez mmap, a powierzchnie powstają przez
+    pygame.image.frombuffer bez dekodowania i kopiowania pikseli.
+    """
+
+    def __init__(self, path=FRAME_CACHE_PATH, enabled=FRAME_CACHE) -> None:
+        self.path = path
+        self.enabled = enabled
+        # skrót zawartości pliku źródłowego, klucz: ścieżka arkusza
+        self.hashes = {}
+        # klatki wczytane z dysku, klucz: ścieżka arkusza, a w nim klucz klatki
+        self.frames = {}
+        # klatki utworzone w tej sesji; trzymamy je słabo, żeby atlas mógł je zwolnić,
+        # więc zapisywane są tylko te, które jeszcze żyją
+        self.added = {}
+        # arkusze, do których dodano nowe klatki (trzeba je zapisać)
+        self.dirty = set()
+        # otwarte mapy plików, powierzchnie wskazują na ich pamięć
+        self.maps = {}
+        # numer wersji ostatniego wczytanego albo zapisanego pliku, klucz: ścieżka arkusza
+        self.generations = {}
+
+        self.hits = 0
+        self.misses = 0
+
+    def source_hash(self, sheet):
+        if sheet not in self.hashes:
+            with open(sheet, "rb") as file:
+                self.hashes[sheet] = hashlib.sha1(file.read()).hexdigest()
+        return self.hashes[sheet]
+
+    def file_prefix(self, sheet):
+        return sheet.replace("/", "_").replace("\\", "_") + "-"
+
+    def file_name(self, sheet, generation):
+        return os.path.join(self.path, f"{self.file_prefix(sheet)}{self.source_hash(sheet)[:16]}.{generation}.bin")
+
+    def latest_generation(self, sheet):
+        """Zwraca najnowszy numer wersji pliku pasującego do źródła (0, jeżeli nie ma żadnego)"""
+        prefix = self.file_prefix(sheet) + self.source_hash(sheet)[:16] + "."
+        generations = [0]
+        try:
+            names = os.listdir(self.path)
+        except OSError:
+            return 0
+        for name in names:
+            generation = name[len(prefix):-len(".bin")]
+            if name.startswith(prefix) and name.endswith(".bin") and generation.isdigit():
+                generations.append(int(generation))
+        return max(generations)
+
+    def load(self, sheet):
+        """Mapuje plik arkusza (jeżeli istnieje i pasuje do źródła) i zwraca jego klatki"""
+        if sheet in self.frames:
+            return self.frames[sheet]
+        self.frames[sheet] = {}
+        if not self.enabled:
+            return self.frames[sheet]
+
+        self.generations[sheet] = self.latest_generation(sheet)
+        try:
+            with open(self.file_name(sheet, self.generations[sheet]), "rb") as file:
+                data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+        except (OSError, ValueError):
+            return self.frames[sheet]
+
+        # cache da się zawsze odtworzyć, więc uszkodzony plik (np. ucięty) to zwykłe chybienie:
+        # klatki zostaną wycięte od nowa, a zapis nadpisze plik nową wersją
+        try:
+            frames = self.read_frames(data)
+        except (struct.error, ValueError, KeyError, TypeError):
+            return self.frames[sheet]
+        self.frames[sheet] = frames
+        self.maps[sheet] = data
+        return frames
+
+    def read_frames(self, data):
+        """Tworzy powierzchnie klatek wskazujące na pamięć zmapowanego pliku (ValueError, jeżeli plik jest zły)"""
+        magic, version, header_size = struct.unpack_from("<4sII", data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not a frame cache file")
+
+        header = json.loads(data[12:12 + header_size])
+        # przesunięcia klatek liczone są od początku pikseli
+        start = 12 + header_size
+        buffer = memoryview(data)
+        frames = {}
+        for key, (offset, width, height) in header["frames"].items():
+            size = width * height * 4
+            if offset < 0 or width <= 0 or height <= 0 or start + offset + size > len(data):
+                raise ValueError(f"frame {key} outside the file")
+            frames[key] = pygame.image.frombuffer(buffer[start + offset:start + offset + size], (width, height), "BGRA")
+        return frames
+
+    def get(self, sheet, key):
+        image = self.load(sheet).get(key)
+        if image is None and sheet in self.added:
+            image = self.added[sheet].get(key)
+        if image is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return image
+
+    def add(self, sheet, key, image):
+        if not self.enabled:
+            return
+        self.added.setdefault(sheet, weakref.WeakValueDictionary())[key] = image
+        self.dirty.add(sheet)
+
+    def save(self):
+        """Zapisuje arkusze z nowymi klatkami do nowej wersji pliku, zmapowane starsze wersje zostają nietknięte"""
+        if not self.dirty:
+            return
+        # cache jest tylko przyspieszeniem, więc katalog tylko do odczytu (albo pełny dysk) nie przerywa gry
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            for sheet in self.dirty:
+                self.save_sheet(sheet)
+        except OSError as error:
+            print(f"frame cache not saved: {error}")
+        self.dirty.clear()
+
+    def save_sheet(self, sheet):
+        """Zapisuje plik jednego arkusza (OSError przy błędzie zapisu, bez pliku tymczasowego)"""
+        frames = {}
+        pixels = []
+        offset = 0
+        images = dict(self.load(sheet))
+        images.update(self.added.get(sheet, {}).items())
+        for key, image in images.items():
+            data = pygame.image.tobytes(image, "BGRA")
+            frames[key] = [offset, image.get_width(), image.get_height()]
+            pixels.append(data)
+            offset += len(data)
+
+        header = json.dumps({"source": sheet, "hash": self.source_hash(sheet), "frames": frames}).encode()
+        # piksele zaczynają się od pełnych 16 bajtów
+        header = header.ljust(-(-(12 + len(header)) // 16) * 16 - 12)
+
+        self.generations[sheet] = max(self.generations.get(sheet, 0), self.latest_generation(sheet)) + 1
+        name = self.file_name(sheet, self.generations[sheet])
+        try:
+            with open(name + ".tmp", "wb") as file:
+                file.write(struct.pack("<4sII", MAGIC, VERSION, len(header)))
+                file.write(header)
+                for data in pixels:
+                    file.write(data)
+            os.replace(name + ".tmp", name)
+        except OSError:
+            # nie zostawiamy niedokończonego pliku tymczasowego
+            try:
+                os.remove(name + ".tmp")
+            except OSError:
+                pass
+            raise
+
+        # usuwamy pliki ze starych wersji arkusza; plik zmapowany w tej sesji na Windowsie
+        # jest zablokowany, więc zostaje do następnego zapisu
+        for old in os.listdir(self.path):
+            if old.startswith(self.file_prefix(sheet)) and os.path.join(self.path, old) != name:
+                try:
+                    os.remove(os.path.join(self.path, old))
+                except OSError:
+                    pass
+
+# wspólna instancja, używana przez atlas tekstur
+frame_cache = FrameCache()
+
+
+# wypalenie wszystkich klatek do cache (także pocisków we wszystkich kierunkach)
+# uruchomienie: python src/framecache.py
+if __name__ == "__main__":
+    import time
+
+    pygame.init()
+    pygame.display.set_mode((WIDTH, HEIGTH))
+    start = time.perf_counter()
+
+    from level import Level
+    from projectile import Fireball, Laserbeam
+    # atlas korzysta z modułu framecache, a nie z __main__
+    from framecache import frame_cache
+    from atlas import atlas
+    level = Level()
+    group = pygame.sprite.Group()
+    for facing in ("up", "down", "left", "right"):
+        Fireball((0, 0), [group], facing, level.obstacle_sprites, 1)
+        Laserbeam((0, 0), [group], facing, level.obstacle_sprites, 1)
+    # animacje są wycinane dopiero przy użyciu, więc wycinamy wszystkie zapisane w atlasie
+    # i trzymamy je do zapisu (atlas mógłby je zwolnić)
+    animations = [atlas.animation(sheet, animation) for sheet, animation in list(atlas.specs)]
+    frame_cache.save()
+
+    print(f"level loaded in {(time.perf_counter() - start) * 1000:.0f} ms, cache hits {frame_cache.hits}, misses {frame_cache.misses}")
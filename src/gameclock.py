@@ -0,0 +1,19 @@
+class GameClock:
+    """
+    Czas symulacji w milisekundach. Płynie tylko w Level.update(), o stały krok na każdy krok
+    symulacji, więc cooldowny, respawn i animacje nie zależą od tego, jak szybko gra się rysuje,
+    a w czasie pauzy (np. kiedy okno jest zminimalizowane) po prostu stoją.
+    """
+
+    def __init__(self) -> None:
+        self.time = 0
+
+    def ticks(self):
+        return self.time
+
+    def advance(self, dt):
+        """Przesuwa czas o dt sekund (jeden krok symulacji)"""
+        self.time += dt * 1000
+
+# wspólna instancja, z której czas gry biorą wszystkie klasy
+game_clock = GameClock()
@@ -0,0 +1,95 @@
+import time
+import pygame
+from settings import *
+from level import Level
+from player import Player
+from enemy import Enemy
+from audio import audio
+from controls import controls
+from gameclock import game_clock
+
+class HeldKeys:
+    """Stan klawiatury z podanymi wciśniętymi klawiszami, zamiast pygame.key.get_pressed()"""
+
+    def __init__(self, *pressed) -> None:
+        self.pressed = set(pressed)
+
+    def __getitem__(self, key):
+        return key in self.pressed
+
+class Patrol:
+    """
+    Prosty bot do symulacji: chodzi w kółko (każdy kierunek przez steps kroków)
+    i co jakiś czas rzuca kulę ognia, żeby gracz walczył z przeciwnikami.
+    """
+
+    def __init__(self, steps=SIMULATION_RATE * 2) -> None:
+        self.steps = steps
+        self.directions = (pygame.K_RIGHT, pygame.K_DOWN, pygame.K_LEFT, pygame.K_UP)
+        self.count = 0
+
+    def __call__(self, level):
+        self.count += 1
+        direction = self.directions[self.count // self.steps % len(self.directions)]
+        if self.count % SIMULATION_RATE == 0:
+            return HeldKeys(pygame.K_SPACE)
+        return HeldKeys(direction)
+
+class HeadlessGame:
+    """
+    Gra bez okna i dźwięku (np. na serwerze albo w CI). Poziom ma prawdziwe kolizje, AI przeciwników,
+    walkę i respawn, ale nic nie jest rysowane ani odtwarzane, a kroki symulacji idą jeden po drugim
+    tak szybko, jak pozwala procesor. input(level) zwraca stan klawiatury na każdy krok.
+    """
+
+    def __init__(self, input=None) -> None:
+        # tylko czcionki (napisy nad przeciwnikami powstają w konstruktorach), bez okna i miksera
+        pygame.font.init()
+        audio.enabled = False
+        self.input = input or (lambda level: HeldKeys())
+        # Player.dead jest wspólne dla klasy, a kolejna symulacja zaczyna od żywego gracza
+        Player.dead = False
+        self.level = Level(headless=True)
+        self.steps = 0
+
+    def step(self):
+        controls.state = self.input(self.level)
+        self.level.update(SIMULATION_STEP)
+        self.steps += 1
+
+    def run(self, minutes):
+        """Symuluje podaną liczbę minut gry (albo do śmierci gracza), zwraca liczbę kroków"""
+        steps = int(minutes * 60 * SIMULATION_RATE)
+        for _ in range(steps):
+            if Player.dead:
+                break
+            self.step()
+        return self.steps
+
+    def stats(self):
+        enemies = [sprite for sprite in self.level.visible_sprites if isinstance(sprite, Enemy)]
+        player = self.level.player
+        return {'minutes': game_clock.ticks() / 60000, 'steps': self.steps, 'dead': Player.dead,
+                'health': player.health, 'level': player.level, 'exp': player.exp,
+                'enemies': len(enemies), 'respawning': len(self.level.respawn_list)}
+
+
+# symulacja bez okna i dźwięku, tak szybko jak się da
+# uruchomienie: python src/headless.py [minuty] [idle|patrol]
+if __name__ == "__main__":
+    import sys
+
+    minutes = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+    bot = Patrol() if len(sys.argv) > 2 and sys.argv[2] == "patrol" else None
+
+    start = time.perf_counter()
+    game = HeadlessGame(bot)
+    loaded = time.perf_counter()
+    game.run(minutes)
+    elapsed = time.perf_counter() - loaded
+
+    stats = game.stats()
+    print(f"level loaded in {(loaded - start) * 1000:.0f} ms")
+    print(f"simulated {stats['minutes']:.1f} min ({stats['steps']} steps) in {elapsed:.2f} s, "
+          f"{stats['minutes'] * 3600 / max(elapsed, 1e-9):.0f} simulated minutes per hour")
+    print(stats)
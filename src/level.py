@@ -6,27 +6,42 @@ from projectile import Fireball
 from ui import UI
 from enemy import Skeleton, Slime, Nightborne, Enemy
 from elements import *
+from assets import assets
+from text import text_cache
+from chunks import ChunkLayer
+from dirty import dirty_rects
+from spatial import SpatialHash, DrawOrder, CollisionGroup, SolidityGrid
+from gameclock import game_clock
 
 class Level:
-    def __init__(self):
+    def __init__(self, headless=False):
         # Pobierz powierzchnię wyświetlania
         self.display_surface = pygame.display.get_surface()
+        # bez okna (headless.py) poziom tylko symuluje: nie ma chunków z trawą, UI ani render()
+        self.headless = headless
+
+        self.grass_image = assets.image("img/assets/grass.png")
 
-        self.grass_image = pygame.image.load("img/assets/grass.png").convert_alpha()
-        self.grass_image = pygame.transform.scale(self.grass_image, (TILESIZE,TILESIZE))
+        # trawa jest rysowana tylko raz, do chunków
+        self.ground = None
+        if not headless:
+            self.ground = ChunkLayer(alpha=False)
+            self.ground.fill(self.grass_image)
 
         # Grupy sprite'ów (dodanie warstwowania)
         self.visible_sprites = YSortCameraGroup()
-        self.obstacle_sprites = pygame.sprite.Group()
+        self.obstacle_sprites = CollisionGroup()
         self.walkable_sprites = pygame.sprite.Group()
         self.fireball_sprites = pygame.sprite.Group()
         self.decor_sprites = pygame.sprite.Group()
 
         # Tworzenie mapy
         self.create_map()
+        if LATE_INPUT:
+            self.visible_sprites.latest.add(self.player)
 
         # UI
-        self.ui = UI()
+        self.ui = None if headless else UI()
 
         #lista obiektów do respawnu
         self.respawn_list = []
@@ -71,24 +86,57 @@ class Level:
                 elif col == "bld":  #woda
                     bloodtower((x, y), (self.visible_sprites, self.obstacle_sprites))
 
+        self.bake_static_tiles()
+
+        # mapa zajętości terenu, zapytania o kolizję z terenem zaczynają się od niej
+        self.solidity = SolidityGrid()
+        self.obstacle_sprites.set_solidity(self.solidity)
+
+    # nieruchome kafelki mieszczące się w jednym kafelku mapy rysujemy raz do chunków z trawą
+    # i usuwamy z visible_sprites, tak żeby co klatkę sortować tylko postacie, animowane elementy
+    # i wysokie elementy (np. drzewa), które postać może zasłaniać albo być przez nie zasłaniana
+    def bake_static_tiles(self):
+        tiles = [sprite for sprite in self.visible_sprites if isinstance(sprite, Tile)]
+        # zachowujemy dotychczasową kolejność: najpierw decor, potem reszta według centery
+        tiles.sort(key=lambda tile: (not getattr(tile, 'is_decor', False), tile.rect.centery))
+
+        for tile in tiles:
+            width, height = tile.image.get_size()
+            if width > TILESIZE or height > TILESIZE:
+                continue
+            # bez okna nic nie rysujemy, ale kafelki wypadają z update() tak samo jak w zwykłej grze
+            if not self.headless:
+                self.ground.blit(tile.image, tile.rect.topleft)
+            self.visible_sprites.remove(tile)
+
     def draw_background(self):
-        for row in range(0, MAP_HEIGHT, TILESIZE):
-            for col in range(0, MAP_WIDTH, TILESIZE):
-                self.display_surface.blit(self.grass_image, (col, row))
+        self.ground.draw(self.display_surface, self.visible_sprites.offset)
                 
-    def run(self):
-        self.draw_background()
-        self.visible_sprites.custom_draw(self.player)
+    def update(self, dt=SIMULATION_STEP):
+        """Jeden krok symulacji o stałej długości dt sekund"""
+        game_clock.advance(dt)
         self.visible_sprites.update()
         self.fireball_sprites.update()
 
-        self.ui.display(self.player)
-
         #aktualizacja respawnu
         self.update_respawn()
+
+    def render(self, alpha=1.0):
+        """
+        Rysuje grę. alpha (od 0 do 1) to część kroku symulacji, która upłynęła od ostatniego update(),
+        sprite'y są rysowane pomiędzy położeniem sprzed i po tym kroku.
+        """
+        if self.headless:
+            raise RuntimeError("Level(headless=True) has no display or UI and cannot be rendered")
+        self.visible_sprites.alpha = alpha
+        self.visible_sprites.update_offset(self.player)
+        self.draw_background()
+        self.visible_sprites.custom_draw(self.player)
+
+        self.ui.display(self.player)
         
     def update_respawn(self):
-        current_time = pygame.time.get_ticks()
+        current_time = game_clock.ticks()
         for respawn_info in self.respawn_list[:]:
             if current_time - respawn_info['death_time'] > 6000:  # 1 minuta = 60000 ms
                 enemy_class = respawn_info['class']
@@ -104,7 +152,7 @@ class Level:
             'pos': enemy.rect.topleft,
             'level': enemy.level,
             'exp': enemy.exp,
-            'death_time': pygame.time.get_ticks()
+            'death_time': game_clock.ticks()
         }
         self.respawn_list.append(respawn_info)
     
@@ -115,59 +163,154 @@ class YSortCameraGroup(pygame.sprite.Group):
         super().__init__()
 
         self.display_surface = pygame.display.get_surface()
-        self.half_width = self.display_surface.get_size()[0] // 2
-        self.half_height = self.display_surface.get_size()[1] // 2
+        # bez okna (tryb headless) kamera liczy się dla ekranu o domyślnym rozmiarze
+        width, height = self.display_surface.get_size() if self.display_surface else (WIDTH, HEIGTH)
+        self.half_width = width // 2
+        self.half_height = height // 2
         self.offset = pygame.math.Vector2()
+        # offset z poprzedniej klatki, przesunięcie kamery zmienia cały ekran
+        self.last_offset = None
 
-        self.grass_image = pygame.image.load("img/assets/grass.png").convert_alpha()
-        self.grass_image = pygame.transform.scale(self.grass_image, (TILESIZE, TILESIZE))
+        # indeks przestrzenny, dzięki któremu rysujemy tylko sprite'y widoczne na ekranie
+        self.index = SpatialHash()
+        # sprite'y dodane do grupy, które nie mają jeszcze rect (dodawane w Sprite.__init__);
+        # słownik zachowuje kolejność dodania, od której zależy kolejność rysowania przy równym centery
+        self.unindexed = {}
 
-        self.user_font = pygame.font.Font(SPELL_FONT, 14)
+        # kolejność rysowania, decor i reszta są rozdzielane raz, przy dodaniu do grupy
+        self.decor_order = DrawOrder()
+        self.sprite_order = DrawOrder()
+        # lista par (obraz, pozycja) używana ponownie w każdej klatce, wysyłana jednym blits()
+        self.blit_buffer = []
+        # położenia sprite'ów sprzed ostatniego kroku symulacji i część kroku do narysowania
+        self.previous_positions = {}
+        self.alpha = 1.0
+        # sprite'y zawsze rysowane w najnowszym położeniu (sterowany przez gracza przy LATE_INPUT)
+        self.latest = set()
 
-    def custom_draw(self, player):
+        self.user_font = assets.load_font(SPELL_FONT, 14)
+        self.xp_font = assets.load_font(None, 20)
+        self.xp_glyphs = text_cache.glyphs(self.xp_font, True, (255, 255, 0))
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        self.unindexed[sprite] = None
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        self.unindexed.pop(sprite, None)
+        self.index.remove(sprite)
+        self.decor_order.remove(sprite)
+        self.sprite_order.remove(sprite)
+
+    def index_new_sprites(self):
+        if not self.unindexed:
+            return
+        for sprite in self.unindexed:
+            if hasattr(sprite, 'rect'):
+                self.index.insert(sprite, sprite.rect)
+                if getattr(sprite, 'is_decor', False):
+                    self.decor_order.insert(sprite)
+                else:
+                    self.sprite_order.insert(sprite)
+        self.unindexed = {sprite: None for sprite in self.unindexed if sprite not in self.index}
+
+    def update(self, *args, **kwargs):
+        self.index_new_sprites()
+        self.previous_positions = {sprite: sprite.rect.topleft for sprite in self.index.items}
+        super().update(*args, **kwargs)
+        # przepisujemy w indeksie i w kolejności rysowania tylko te sprite'y, które się ruszyły
+        self.index_new_sprites()
+        for sprite in self.index.items.copy():
+            self.index.move(sprite, sprite.rect)
+            if sprite in self.decor_order:
+                self.decor_order.move(sprite)
+            else:
+                self.sprite_order.move(sprite)
+
+    # zwraca sprite'y, których rect zachodzi na ekran powiększony o margines
+    def visible(self):
+        self.index_new_sprites()
+        view = pygame.Rect(self.offset.x, self.offset.y, self.display_surface.get_width(), self.display_surface.get_height())
+        view.inflate_ip(VIEWPORT_MARGIN * 2, VIEWPORT_MARGIN * 2)
+        return {sprite for sprite in self.index.query(view) if view.colliderect(sprite.rect)}
 
-        self.offset.x = player.rect.centerx - self.half_width
-        self.offset.y = player.rect.centery - self.half_height
+    # położenie sprite'a do narysowania, pomiędzy poprzednim a obecnym krokiem symulacji
+    def position(self, sprite):
+        x, y = sprite.rect.topleft
+        previous = self.previous_positions.get(sprite)
+        if previous is None or self.alpha >= 1 or sprite in self.latest:
+            return x, y
+        return previous[0] + (x - previous[0]) * self.alpha, previous[1] + (y - previous[1]) * self.alpha
+
+    # ustawia kamerę na graczu, nie wychodząc poza mapę
+    def update_offset(self, player):
+        x, y = self.position(player)
+        self.offset.x = x + player.rect.width // 2 - self.half_width
+        self.offset.y = y + player.rect.height // 2 - self.half_height
 
         self.offset.x = max(0, min(self.offset.x, MAP_WIDTH - self.display_surface.get_width()))
         self.offset.y = max(0, min(self.offset.y, MAP_HEIGHT - self.display_surface.get_height()))
 
-        # rozdzielamy decor sprites i nondecor sprites
-        decor_sprites = [sprite for sprite in self.sprites() if getattr(sprite, 'is_decor', False)]
-        non_decor_sprites = [sprite for sprite in self.sprites() if not getattr(sprite, 'is_decor', False)]
+    def custom_draw(self, player):
+        self.update_offset(player)
+        if self.offset != self.last_offset:
+            dirty_rects.invalidate()
+            self.last_offset = self.offset.copy()
 
-        # najpierw rysujemy elementy decor
-        for sprite in sorted(decor_sprites, key=lambda sprite: sprite.rect.centery):
-            offset_pos = sprite.rect.topleft - self.offset
-            self.display_surface.blit(sprite.image, offset_pos)
+        visible_sprites = self.visible()
 
-        # rysujemy resztę elementów
-        for sprite in sorted(non_decor_sprites, key=lambda sprite: sprite.rect.centery):
-            offset_pos = sprite.rect.topleft - self.offset
-            self.display_surface.blit(sprite.image, offset_pos)
-            if isinstance(sprite, Enemy):
-                sprite.draw_name(self.display_surface, self.offset)
+        # najpierw rysujemy elementy decor, potem resztę elementów
+        self.draw_layer(self.decor_order.ordered(visible_sprites))
+        self.draw_layer(self.sprite_order.ordered(visible_sprites))
 
-        # Rysowanie gracza
-        self.display_surface.blit(player.image, player.rect.topleft - self.offset)
+        # gracz jest rysowany razem z resztą sprite'ów według centery, więc drzewa
+        # zasłaniają go, kiedy stoi za nimi, a on zasłania drzewa, kiedy stoi przed nimi
 
         # Rysowanie XP i poziomu gracza
         self.draw_xp_texts(player)
         self.show_username(player.username, player)
         self.show_level(player)
 
+    # rysuje sprite'y (i imiona przeciwników) w podanej kolejności jednym wywołaniem blits()
+    def draw_layer(self, sprites):
+        offset_x, offset_y = int(self.offset.x), int(self.offset.y)
+        buffer = self.blit_buffer
+        buffer.clear()
+        for sprite in sprites:
+            x, y = self.position(sprite)
+            x, y = int(x), int(y)
+            buffer.append((sprite.image, (x - offset_x, y - offset_y)))
+            if isinstance(sprite, Enemy):
+                # imię liczone od rect, więc przesuwamy kamerę o różnicę między rect a położeniem
+                rect = sprite.rect
+                buffer.extend(sprite.name_blits((offset_x + rect.x - x, offset_y + rect.y - y)))
+
+        drawn = self.display_surface.blits(buffer, doreturn=dirty_rects.enabled)
+        if drawn:
+            dirty_rects.extend(drawn)
+
+    # środek i góra gracza w położeniu, w którym jest rysowany
+    def player_anchor(self, player):
+        x, y = self.position(player)
+        return int(x) + player.rect.width // 2, int(y)
+
     def draw_xp_texts(self, player):
+        centerx, top = self.player_anchor(player)
         for text in player.xp_texts:
-            xp_surface = pygame.font.Font(None, 20).render(f"+{text['amount']}xp", True, (255, 255, 0))
-            offset_pos = pygame.Vector2(player.rect.centerx, player.rect.top + 30) - self.offset
-            self.display_surface.blit(xp_surface, offset_pos)
+            offset_pos = pygame.Vector2(centerx, top + 30) - self.offset
+            xp_text = f"+{text['amount']}xp"
+            self.xp_glyphs.draw(self.display_surface, xp_text, offset_pos)
+            dirty_rects.add(self.xp_glyphs.get_rect(xp_text, topleft = offset_pos))
     
     def show_username(self, username, player):
-        username_surf = self.user_font.render(username, False, TEXT_COLOR)
-        offset_pos = pygame.Vector2(player.rect.centerx - username_surf.get_width() // 2, player.rect.top - 20) - self.offset
-        self.display_surface.blit(username_surf, offset_pos)
+        username_surf = text_cache.render(self.user_font, username, False, TEXT_COLOR)
+        centerx, top = self.player_anchor(player)
+        offset_pos = pygame.Vector2(centerx - username_surf.get_width() // 2, top - 20) - self.offset
+        dirty_rects.add(self.display_surface.blit(username_surf, offset_pos))
     
     def show_level(self,player):
-        level_surf = self.user_font.render(f"lvl {player.level}", False, TEXT_COLOR)
-        offset_pos = pygame.Vector2(player.rect.centerx - level_surf.get_width() // 2, player.rect.top - 5) - self.offset
-        self.display_surface.blit(level_surf, offset_pos)
\ No newline at end of file
+        level_surf = text_cache.render(self.user_font, f"lvl {player.level}", False, TEXT_COLOR)
+        centerx, top = self.player_anchor(player)
+        offset_pos = pygame.Vector2(centerx - level_surf.get_width() // 2, top - 5) - self.offset
+        dirty_rects.add(self.display_surface.blit(level_surf, offset_pos))
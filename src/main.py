@@ -1,18 +1,43 @@
-import pygame, sys
+import time
+# od tej chwili mierzymy czas do pierwszej klatki i do pojawienia się menu
+launch_time = time.perf_counter()
+
+import pygame
 from level import Level               
 from settings import *
 from pyvidplayer import Video
 from ui import StartMenu, EndMenu
 from player import Player
+from audio import audio
+from dirty import dirty_rects
+from framecache import frame_cache
+from audit import format_audit
+from preload import Preloader
+from screenloop import ScreenLoop, VideoScreen
+from window import WindowState
+from controls import controls, latency
+from shutdown import quit_game
 
 class Game:
     def __init__(self) -> None:
         pygame.init()
         self.screen = pygame.display.set_mode((WIDTH, HEIGTH))
+        if FORMAT_AUDIT:
+            self.screen = format_audit.install()
         self.clock = pygame.time.Clock()
-        self.level = Level()
-        self.start_menu = StartMenu()
-        self.end_menu = EndMenu()
+        # intro i menu śpią do zdarzenia zamiast rysować się w kółko
+        self.screen_loop = ScreenLoop()
+        # fokus i widoczność okna, w tle gra zwalnia albo staje
+        self.window = WindowState()
+        self.in_background = False
+        # obrazy wczytują się w tle w czasie filmu intro, poziom powstaje dopiero przed menu
+        self.preloader = Preloader()
+        self.preloader.start()
+        self.level = None
+        # czasy od uruchomienia gry, klucz: nazwa momentu
+        self.timings = {}
+        # dekodujemy wszystkie efekty głosowe zanim powstanie poziom
+        audio.load()
         # zmiana tytułu okna
         pygame.display.set_caption("The Legend of Valdoria")
         self.vid = Video("Intro/Valdoria Intro.mp4")
@@ -21,78 +46,129 @@ class Game:
         pygame.mixer.music.load("sounds/music/valdoria1.mp3")
         for i in range(2,6):
             pygame.mixer.music.queue(f"sounds/music/valdoria{i}.mp3")
+
+    def mark(self, name):
+        """Zapisuje czas od uruchomienia gry do danego momentu (tylko za pierwszym razem)"""
+        if name not in self.timings:
+            self.timings[name] = (time.perf_counter() - launch_time) * 1000
+            print(f"{name}: {self.timings[name]:.0f} ms after launch")
+
+    def draw_progress(self, done, total):
+        # pasek postępu na środku ekranu, wysyłamy całą klatkę
+        self.screen.fill('black')
+        rect = pygame.Rect(0, 0, WIDTH // 3, BAR_HEIGHT)
+        rect.center = (WIDTH // 2, HEIGTH // 2)
+        fill = rect.copy()
+        fill.width = rect.width * done // max(total, 1)
+        pygame.draw.rect(self.screen, EXP_COLOR, fill)
+        pygame.draw.rect(self.screen, TEXT_COLOR, rect, 2)
+        pygame.display.update()
+        pygame.event.pump()
+
+    def load(self):
+        """Czeka na obrazy wczytywane w tle (z paskiem postępu) i tworzy poziom oraz menu"""
+        if self.level:
+            return
+        self.preloader.wait(self.draw_progress)
+        self.level = Level()
+        # klatki wycięte przy tym uruchomieniu zapisujemy na dysk, następny start je zmapuje
+        frame_cache.save()
+        self.start_menu = StartMenu()
+        self.end_menu = EndMenu()
         print("Game initialized with level:", type(self.level))
     
     # zaczynamy grę od filmiku intro który zbliży nas do losów Valdorii
     def intro(self):
-        while self.vid.active:
-            self.vid.draw(self.screen, (0,0), False)
-            pygame.display.update()
-
-            for event in pygame.event.get():
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_ESCAPE:
-                        self.vid.close()
-                        self.start()
-                elif event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-        
+        intro = VideoScreen(self.vid)
+        self.screen_loop.run(intro, intro.timer, self.intro_idle)
         self.start()
+
+    def intro_idle(self):
+        if self.screen_loop.frames:
+            self.mark("first frame")
+        # w przerwach między klatkami filmu odbieramy obrazy wczytane w tle
+        self.preloader.poll()
     
     # funkcja wywołuje menu startowe oraz inicjuje start gry
     def start(self):
+        self.load()
         pygame.mixer.music.set_volume(0.1)
         pygame.mixer.music.play()
 
-        while True:
-            events = pygame.event.get()
-            for event in events:
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                
-            start = self.start_menu.display(events)
-            pygame.display.update()
-
-            if start:
-                Player.username = self.start_menu.username
-                break
-        
+        self.screen_loop.run(self.start_menu, idle=lambda: self.mark("menu"))
+        Player.username = self.start_menu.username
+
         self.run()
             
 
     # main loop
     def run(self):
-        
+        dirty_rects.invalidate()
+        # czas, którego symulacja jeszcze nie nadrobiła (krótszy od jednego kroku)
+        accumulator = 0.0
+        last_frame = time.perf_counter()
+
+        # każda klatka: wejście -> symulacja -> rysowanie -> wysłanie do okna
         while True:
             # check the events, and if it is QUIT event then close the game
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-            
-            self.level.run()
-            pygame.display.update()
-            self.clock.tick(FPS)
+                    quit_game()
+                self.window.handle(event)
+                controls.handle(event)
+            if not LATE_INPUT:
+                controls.sample()
+
+            if self.window.background != self.in_background:
+                self.set_background(self.window.background)
+
+            now = time.perf_counter()
+            paused = self.in_background and BACKGROUND_MODE == 'pause'
+            steps = 0
+            if not paused:
+                # symulacja idzie stałymi krokami, ile by nie trwała klatka
+                accumulator += min(now - last_frame, MAX_FRAME_TIME)
+                steps = int(accumulator // SIMULATION_STEP)
+                for step in range(steps):
+                    if LATE_INPUT and step == steps - 1:
+                        # ostatni krok przed rysowaniem dostaje klawisze odczytane jak najpóźniej
+                        pygame.event.pump()
+                        controls.sample()
+                    self.level.update(SIMULATION_STEP)
+                accumulator -= steps * SIMULATION_STEP
+            last_frame = now
+
+            if not self.in_background or (not paused and self.window.visible):
+                self.level.render(accumulator / SIMULATION_STEP)
+                dirty_rects.present()
+                if steps:
+                    latency.presented(controls.sample_time, controls.event_time)
+                    controls.event_time = None
+            self.clock.tick(BACKGROUND_FPS if self.in_background else FPS)
 
             if Player.dead:
                 break
         
         self.end()
             
+    def set_background(self, background):
+        """Przełącza grę w tryb tła (okno bez fokusu albo zminimalizowane) i z powrotem"""
+        self.in_background = background
+        # zdarzenia sprzed przejścia w tło nie wliczają się do opóźnienia
+        controls.event_time = None
+        if background:
+            # w trybie 'pause' symulacja stoi, a z nią czas gry, więc cooldowny i respawn po powrocie nie przeskoczą
+            audio.pause()
+        else:
+            audio.resume()
+            # po powrocie wysyłamy całą klatkę
+            dirty_rects.invalidate()
+
     # funckja odpowiedzialna za obsługę menu końcowego
     def end(self):
-        
         while True:
-            events = pygame.event.get()
-            for event in events:
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                
-            end = self.end_menu.display(events)
-            pygame.display.update()
+            # "Try Again" nie ma jeszcze restartu gry, więc zostajemy w menu końcowym
+            self.screen_loop.run(self.end_menu)
 
 
 if __name__ == "__main__":
@@ -1,25 +1,16 @@
 import pygame
 from itertools import chain
+from atlas import Animations, frame_rects
 
 class AnimationPlayer:
     def __init__(self) -> None:
-        self.heal_sprite = pygame.image.load("img/spells/heal.png")
-        self.frames = {
-            'heal': [self.create_animation(self.heal_sprite, 0, 5, 192, 192),
-                     self.create_animation(self.heal_sprite, 1, 5, 192, 192),
-                     self.create_animation(self.heal_sprite, 2, 5, 192, 192)]
-        }
-
-    def get_sprite(self, sheet, x, y, width, height, offset = 0):
-        image = pygame.Surface((width, height), pygame.SRCALPHA)
-        image.blit(sheet, (0, 0), (x * width + offset, y * height, width, height))
-        return image
-
-    def create_animation(self, sheet, row, num_frames, width, heigth):
-        return [self.get_sprite(sheet, i, row, width, heigth) for i in range(num_frames)]
+        self.heal_sprite = "img/spells/heal.png"
+        self.frames = Animations(self.heal_sprite)
+        for row in range(3):
+            self.frames.add(f"heal_{row}", frame_rects(row, 5, (192, 192)))
 
     def create_healing_particles(self, pos, groups):
-        animation_frames = list(chain.from_iterable(self.frames['heal']))
+        animation_frames = list(chain.from_iterable(self.frames[f"heal_{row}"] for row in range(3)))
         Particle(pos, animation_frames, groups)
 
 class Particle(pygame.sprite.Sprite):
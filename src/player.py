@@ -1,8 +1,11 @@
 import pygame
 from settings import *
+from atlas import Animations, frame_rects
+from audio import audio
 from projectile import Fireball, Laserbeam
-from enemy import Skeleton, Slime,Nightborne
 from particles import AnimationPlayer
+from gameclock import game_clock
+from controls import controls
 
 class Player(pygame.sprite.Sprite):
     """Klasa gracza"""
@@ -12,8 +15,28 @@ class Player(pygame.sprite.Sprite):
     
     def __init__(self, pos, groups, obstacle_sprites, fireball_sprites, visible_sprites):
         super().__init__(groups)
-        self.sprite_sheet = pygame.image.load("img/assets/playersprite.png").convert_alpha()
-        self.image = self.get_sprite(self.sprite_sheet, 0, 11, SPRITE_WIDTH, SPRITE_HEIGHT)  # Pierwsza klatka z 11 rzędu (idle)
+        self.collision_layer = LAYER_PLAYER
+        # gracza zatrzymuje teren i woda, przez przeciwników przechodzi
+        self.collision_mask = LAYER_TERRAIN | LAYER_WATER
+        self.sprite_sheet = "img/assets/playersprite.png"
+
+        # Animacje - zapisujemy tylko, skąd wyciąć klatki, atlas wycina je przy pierwszym użyciu
+        self.animations = Animations(self.sprite_sheet)
+        self.create_animation("up", 8, 9, SPRITE_WIDTH, SPRITE_HEIGHT)
+        self.create_animation("left", 9, 9, SPRITE_WIDTH, SPRITE_HEIGHT)
+        self.create_animation("down", 10, 9, SPRITE_WIDTH, SPRITE_HEIGHT)
+        self.create_animation("right", 11, 9, SPRITE_WIDTH, SPRITE_HEIGHT)
+        self.create_animation("death", 20, 6, SPRITE_WIDTH, SPRITE_HEIGHT)
+        self.create_attack_animation("attack_up", 47, 8)
+        self.create_attack_animation("attack_left", 50, 8)
+        self.create_attack_animation("attack_down", 53, 8)
+        self.create_attack_animation("attack_right", 56, 8)
+        self.create_animation("heal_up", 0, 7, SPRITE_WIDTH, SPRITE_HEIGHT)
+        self.create_animation("heal_left", 1, 7, SPRITE_WIDTH, SPRITE_HEIGHT)
+        self.create_animation("heal_down", 2, 7, SPRITE_WIDTH, SPRITE_HEIGHT)
+        self.create_animation("heal_right", 3, 7, SPRITE_WIDTH, SPRITE_HEIGHT)
+
+        self.image = self.animations["right"][0]  # Pierwsza klatka z 11 rzędu (idle)
         self.rect = self.image.get_rect(topleft=pos)
         self.hitbox = self.rect.inflate(-30,-20)
 
@@ -41,41 +64,7 @@ class Player(pygame.sprite.Sprite):
         self.heal_cooldown = False
         self.animation_player = AnimationPlayer() # służy do efektów particle, zagra animację uleczenia
 
-        # EFEKTY GŁOSOWE
-
-        #   efekty chodzenia
-        self.footstep_channel = pygame.mixer.Channel(1)
-        self.footsteps_sound = pygame.mixer.Sound("sounds/effects/footsteps.mp3")
-        self.footsteps_sound.set_volume(0.1)
-
-        # efekt obrażeń
-        self.damage_channel = pygame.mixer.Channel(6)
-        self.damage_sound = pygame.mixer.Sound("sounds/effects/damage.ogg")
-        self.damage_sound.set_volume(0.1)
-
-        # efekt śmierci
-        self.death_channel = pygame.mixer.Channel(7)
-        self.death_sound = pygame.mixer.Sound("sounds/effects/death.wav")
-        self.death_sound.set_volume(0.1)
-
-
-
-        # Animacje
-        self.animations = {
-            "up": self.create_animation(self.sprite_sheet, 8, 9, SPRITE_WIDTH, SPRITE_HEIGHT),
-            "left": self.create_animation(self.sprite_sheet, 9, 9, SPRITE_WIDTH, SPRITE_HEIGHT),
-            "down": self.create_animation(self.sprite_sheet, 10, 9, SPRITE_WIDTH, SPRITE_HEIGHT),
-            "right": self.create_animation(self.sprite_sheet, 11, 9, SPRITE_WIDTH, SPRITE_HEIGHT),
-            "death": self.create_animation(self.sprite_sheet, 20, 6, SPRITE_WIDTH, SPRITE_HEIGHT),
-            "attack_up": self.create_attack_animation(47, 8),
-            "attack_left": self.create_attack_animation(50, 8),
-            "attack_down": self.create_attack_animation(53, 8),
-            "attack_right": self.create_attack_animation(56, 8),
-            "heal_up": self.create_animation(self.sprite_sheet, 0, 7, SPRITE_WIDTH, SPRITE_HEIGHT),
-            "heal_left": self.create_animation(self.sprite_sheet, 1, 7, SPRITE_WIDTH, SPRITE_HEIGHT),
-            "heal_down": self.create_animation(self.sprite_sheet, 2, 7, SPRITE_WIDTH, SPRITE_HEIGHT),
-            "heal_right": self.create_animation(self.sprite_sheet, 3, 7, SPRITE_WIDTH, SPRITE_HEIGHT),
-        }
+
 
         self.current_animation = None
         self.current_frame = 0
@@ -85,10 +74,10 @@ class Player(pygame.sprite.Sprite):
 
         # Klatki spoczynkowe dla każdego kierunku
         self.idle_frames = {
-            "up": self.get_sprite(self.sprite_sheet, 0, 8, SPRITE_WIDTH, SPRITE_HEIGHT),
-            "left": self.get_sprite(self.sprite_sheet, 0, 9, SPRITE_WIDTH, SPRITE_HEIGHT),
-            "down": self.get_sprite(self.sprite_sheet, 0, 10, SPRITE_WIDTH, SPRITE_HEIGHT),
-            "right": self.get_sprite(self.sprite_sheet, 0, 11, SPRITE_WIDTH, SPRITE_HEIGHT)
+            "up": self.animations["up"][0],
+            "left": self.animations["left"][0],
+            "down": self.animations["down"][0],
+            "right": self.animations["right"][0]
         }
         self.idle_frame = self.idle_frames["right"]
 
@@ -111,25 +100,18 @@ class Player(pygame.sprite.Sprite):
         # komunikaty o xp
         self.xp_texts = []
 
-    def get_sprite(self, sheet, x, y, width, height, offset = 0):
-        """Dzieli sprite z kilkoma rysunkami w jednym pliku
-            na pojedyncze kawałki i zwraca jeden rysunek"""
-        image = pygame.Surface((width, height), pygame.SRCALPHA)
-        image.blit(sheet, (0, 0), (x * width + offset, y * height, width, height))
-        return image
-
-    def create_animation(self, sheet, row, num_frames, width, heigth):
-        """Tworzy i zwraca listę pojedynczych obrazów z sprite, za pomocą funkcji get_sprite()"""
-        return [self.get_sprite(sheet, i, row, width, heigth) for i in range(num_frames)]
+    def create_animation(self, name, row, num_frames, width, heigth):
+        """Dodaje animację z jednego rzędu sprite, klatki pobiera z atlasu tekstur dopiero self.animations[name]"""
+        self.animations.add(name, frame_rects(row, num_frames, (width, heigth)))
     
-    def create_attack_animation(self, row, num_frames, width = 64, heigth = 64):
-        # Wczytujemy co czwartą klatkę, zaczynając od pierwszej klatki
-        return [self.get_sprite(self.sprite_sheet, 3 * i, row, width = width, height = heigth, offset=64) for i in range(num_frames)]
+    def create_attack_animation(self, name, row, num_frames, width = 64, heigth = 64):
+        # Wczytujemy co trzecią klatkę, zaczynając od drugiej klatki
+        self.animations.add(name, frame_rects(row, num_frames, (width, heigth), offset=64, stride=3 * width))
 
     # funkcja wywołana, zwiększa exp gracza w zależności od zabitego enemy
     def gain_exp(self, amount):
         self.exp += amount
-        self.xp_texts.append({'amount': amount, 'timer': pygame.time.get_ticks()})
+        self.xp_texts.append({'amount': amount, 'timer': game_clock.ticks()})
         while self.exp >= self.next_level_exp:
             self.level_up()
     
@@ -168,15 +150,15 @@ class Player(pygame.sprite.Sprite):
                 self.alive = False
                 self.current_frame = 0
     
-    # tutaj obsługujemy efekty głosowe
+    # tutaj obsługujemy efekty głosowe, kanały przydziela AudioEngine
     def sound_player(self, sound_type):
-        if sound_type == "footsteps" and not self.footstep_channel.get_busy():
-            self.footstep_channel.play(self.footsteps_sound)
-        elif sound_type == "damage" and not self.damage_channel.get_busy():
-            self.damage_channel.play(self.damage_sound)
-        elif sound_type == "death" and not self.death_channel.get_busy():
-            self.damage_channel.stop()
-            self.death_channel.play(self.death_sound)
+        if sound_type == "footsteps" and not audio.is_playing("footsteps"):
+            audio.play("footsteps")
+        elif sound_type == "damage" and not audio.is_playing("damage"):
+            audio.play("damage")
+        elif sound_type == "death" and not audio.is_playing("death"):
+            audio.stop_all("damage")
+            audio.play("death")
 
     # sprawdza czy mamy wystarczającą ilość many, jeżeli tak, to zmniejsza o ilość wykorzystywaną
     def mana_handler(self, spell:str)->bool:
@@ -205,12 +187,12 @@ class Player(pygame.sprite.Sprite):
                 self.kill()
         else:
             # obsługo cooldownów
-            self.current_time = pygame.time.get_ticks()
+            self.current_time = game_clock.ticks()
             self.fireball_cooldown = False if self.previous_time_fireball == 0 or self.current_time - self.previous_time_fireball >= spell_data['fireball']['cooldown'] else True
             self.laserbeam_cooldown = False if self.previous_time_laserbeam == 0 or self.current_time - self.previous_time_laserbeam >= spell_data["laserbeam"]["cooldown"]  else True
             self.heal_cooldown = False if self.previous_time_heal == 0 or self.current_time - self.previous_time_heal >= spell_data["heal"]["cooldown"]  else True
 
-            keys = pygame.key.get_pressed()
+            keys = controls.keys
             if not self.is_attacking and not self.is_healing:
                 self.current_animation = None
                 self.direction.x = 0
@@ -307,7 +289,7 @@ class Player(pygame.sprite.Sprite):
         if self.direction.x != 0 or self.direction.y != 0:
             self.sound_player("footsteps")
         else:
-            self.footstep_channel.stop()
+            audio.stop_all("footsteps")
 
         self.move(self.stats["speed"])
 
@@ -343,34 +325,26 @@ class Player(pygame.sprite.Sprite):
         self.rect.centerx = self.hitbox.centerx
         self.rect.centery = self.hitbox.centery-10
 
-    # obsługo kolizji
+    # obsługo kolizji, sprawdzamy tylko przeszkody z sąsiednich komórek siatki
     def collision(self, direction):
-            for sprite in self.obstacle_sprites:
-                if sprite.hitbox.colliderect(self.hitbox):
-                    if isinstance(sprite, Slime):
-                        continue  # ignoruj kolizję z slime
-                    if isinstance(sprite, Skeleton):
-                        continue
-                    if isinstance(sprite, Nightborne):
-                        continue
-            
-                    if direction == 'horizontal':
-                        for sprite in self.obstacle_sprites:
-                            if sprite.hitbox.colliderect(self.hitbox):
-                                if self.direction.x > 0:
-                                    self.hitbox.right = sprite.hitbox.left
-                                if self.direction.x < 0:
-                                    self.hitbox.left = sprite.hitbox.right
-
-                    if direction == 'vertical':
-                        for sprite in self.obstacle_sprites:
-                            if sprite.hitbox.colliderect(self.hitbox):
-                                if self.direction.y > 0:
-                                    self.hitbox.bottom = sprite.hitbox.top
-                                if self.direction.y < 0:
-                                    self.hitbox.top = sprite.hitbox.bottom
+            for sprite in self.obstacle_sprites.query(self.hitbox, self.collision_mask):
+                # poprzednie przeszkody mogły już wypchnąć gracza
+                if not sprite.hitbox.colliderect(self.hitbox):
+                    continue
+
+                if direction == 'horizontal':
+                    if self.direction.x > 0:
+                        self.hitbox.right = sprite.hitbox.left
+                    if self.direction.x < 0:
+                        self.hitbox.left = sprite.hitbox.right
+
+                if direction == 'vertical':
+                    if self.direction.y > 0:
+                        self.hitbox.bottom = sprite.hitbox.top
+                    if self.direction.y < 0:
+                        self.hitbox.top = sprite.hitbox.bottom
 
     ########## odnośnie lvl ############
     def update_xp_texts(self):
-        current_time = pygame.time.get_ticks()
+        current_time = game_clock.ticks()
         self.xp_texts = [text for text in self.xp_texts if current_time - text['timer'] <= 1000]
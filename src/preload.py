@@ -0,0 +1,79 @@
+import io
+import time
+import pygame
+from concurrent.futures import ThreadPoolExecutor
+from settings import *
+from assets import assets
+from framecache import frame_cache
+
+def decode_image(path):
+    """Czyta i dekoduje obraz (w wątku roboczym), zwraca surowe piksele, rozmiar, format i kolor przezroczysty"""
+    with open(path, "rb") as file:
+        data = file.read()
+    image = pygame.image.load(io.BytesIO(data), path)
+    pixel_format = "RGBA" if image.get_flags() & pygame.SRCALPHA else "RGB"
+    return pygame.image.tobytes(image, pixel_format), image.get_size(), pixel_format, image.get_colorkey()
+
+class Preloader:
+    """
+    Wczytywanie obrazów w tle, np. w czasie filmu intro. Czytanie plików i dekodowanie PNG
+    robi pula wątków, a główny wątek tylko tworzy z gotowych pikseli powierzchnie i konwertuje je
+    do formatu ekranu (convert_alpha), bo to musi się dziać w wątku, który otworzył okno.
+    Gotowe obrazy trafiają do assets, więc Level() znajduje je w pamięci.
+    """
+
+    def __init__(self, images=PRELOAD_IMAGES, workers=PRELOAD_WORKERS) -> None:
+        self.images = images
+        self.workers = workers
+        self.pool = None
+        # zlecone obrazy, klucz: ścieżka, wartość: (future, rozmiary, w jakich gra używa obrazu)
+        self.pending = {}
+        self.total = 0
+        self.done = 0
+
+    def start(self):
+        """Zleca wczytanie wszystkich obrazów i od razu wraca"""
+        sizes = {}
+        for path, scale in self.images:
+            # arkusz zapisany w cache klatek zostanie zmapowany z dysku, nie trzeba dekodować PNG
+            if scale is None and frame_cache.get(path, "sheet") is not None:
+                continue
+            sizes.setdefault(path, []).append(scale)
+
+        self.pool = ThreadPoolExecutor(self.workers, thread_name_prefix="preload")
+        for path, scales in sizes.items():
+            self.pending[path] = (self.pool.submit(decode_image, path), scales)
+        self.total = len(self.pending)
+        # wątki kończą się same po ostatnim zadaniu
+        self.pool.shutdown(wait=False)
+
+    def receive(self, path):
+        """Tworzy powierzchnię z pikseli zdekodowanych w tle (tylko w głównym wątku)"""
+        future, scales = self.pending.pop(path)
+        pixels, size, pixel_format, colorkey = future.result()
+        image = pygame.image.frombuffer(pixels, size, pixel_format)
+        if colorkey is not None:
+            image.set_colorkey(colorkey)
+        assets.add_source(path, image)
+        for scale in scales:
+            assets.load_image(path, scale)
+        self.done += 1
+
+    def poll(self, budget=PRELOAD_FRAME_BUDGET):
+        """Odbiera gotowe obrazy, ale nie dłużej niż budget milisekund (wywoływane co klatkę intro)"""
+        start = time.perf_counter()
+        for path in [path for path, (future, _) in self.pending.items() if future.done()]:
+            if (time.perf_counter() - start) * 1000 >= budget:
+                break
+            self.receive(path)
+
+    def wait(self, progress=None):
+        """Czeka na wszystkie obrazy, po każdym wywołuje progress(gotowe, wszystkie)"""
+        while self.pending:
+            self.receive(next(iter(self.pending)))
+            if progress:
+                progress(self.done, self.total)
+
+    @property
+    def finished(self):
+        return not self.pending
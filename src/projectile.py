@@ -1,12 +1,22 @@
 from settings import *
+from atlas import atlas, frame_rects
+from audio import audio
 import pygame
 from time import sleep
 
 class Fireball(pygame.sprite.Sprite):
     def __init__(self, pos, groups, facing, hit_sprites, magic_power, radius=FIREBALL_RADIUS) -> None:
         super().__init__(groups)
-        self.sprite_sheet = pygame.image.load("img/spells/fireball.png").convert_alpha()
-        self.image = self.get_sprite(self.sprite_sheet, 0, 0, 48, 48)
+        self.collision_layer = LAYER_PROJECTILE
+        # fireball wybucha na wszystkim, ale obrażenia zadaje tylko przeciwnikom
+        self.collision_mask = LAYER_TERRAIN | LAYER_WATER | LAYER_ENEMY
+        self.sprite_sheet = "img/spells/fireball.png"
+        # klatki obrócone zgodnie z kierunkiem lotu, osobna animacja w atlasie dla każdego kierunku
+        rotate = {"up": 90, "down": -90}.get(facing, 0)
+        flip = facing == "left"
+        self.shoot_animation = atlas.animation(self.sprite_sheet, f"shoot_{facing}", frame_rects(0, 4, (48, 48)), flip=flip, rotate=rotate)
+        self.explode_animation = atlas.animation(self.sprite_sheet, f"explode_{facing}", frame_rects(0, 6, (48, 48), offset=5*48), flip=flip, rotate=rotate)
+        self.image = self.shoot_animation[0]
         self.rect = self.image.get_rect(topleft=pos)
         self.hitbox = self.rect.inflate(-25,-25)
         self.start_x = self.hitbox.x
@@ -18,9 +28,6 @@ class Fireball(pygame.sprite.Sprite):
         self.collide = False
         self.magic_power = magic_power
 
-        self.shoot_animation = [self.get_sprite(self.sprite_sheet, i, 0, 48, 48) for i in range(4)]
-        self.explode_animation = [self.get_sprite(self.sprite_sheet, i, 0, 48, 48, 5*48) for i in range(6)]
-
         self.image_index = 0
         self.animation_speed = 0.1  # Szybkość animacji pocisku
         self.explosion_speed = 0.1
@@ -29,68 +36,43 @@ class Fireball(pygame.sprite.Sprite):
         self.hit_sprites = hit_sprites
 
         # efekty głosowe
-        self.fireball_channel = pygame.mixer.Channel(2)
-
-        self.fireball_sound = pygame.mixer.Sound("sounds/effects/fireball.mp3")
-        self.fireball_sound.set_volume(0.3)
-        self.fireball_channel.play(self.fireball_sound)
-
-        self.explosion_sound = pygame.mixer.Sound("sounds/effects/explosion.wav")
-        self.explosion_sound.set_volume(0.3)
-        self.explosion_sound.fadeout(2)
+        self.fireball_sound = audio.play("fireball")
 
-        # tutaj zmieniamy rotację obrazu fireball w zależności od kierunku w którym został wystrzelony
-        # oraz przesuwamy go tak, żeby był spójny wraz z animacją gracza
+        # tutaj przesuwamy fireball w zależności od kierunku w którym został wystrzelony,
+        # tak żeby był spójny wraz z animacją gracza
         if self.facing == "up":
             self.hitbox.move_ip(-15,-15)
             self.direction = "vertical"
             self.vel = FIREBALL_SPEED * -1
-            self.image = pygame.transform.rotate(self.image, 90)
-            self.shoot_animation = [pygame.transform.rotate(i, 90) for i in self.shoot_animation]
-            self.explode_animation = [pygame.transform.rotate(i, 90) for i in self.explode_animation]
         elif self.facing == "down":
             self.hitbox.move_ip(-15,-10)
             self.direction = "vertical"
             self.vel = FIREBALL_SPEED * 1
-            self.image = pygame.transform.rotate(self.image, -90)
-            self.shoot_animation = [pygame.transform.rotate(i, -90) for i in self.shoot_animation]
-            self.explode_animation = [pygame.transform.rotate(i, -90) for i in self.explode_animation]
         elif self.facing == "left":
             self.hitbox.move_ip(-40,-20)
             self.direction = "horizontal"
             self.vel = FIREBALL_SPEED * -1
-            self.image = pygame.transform.flip(self.image, flip_x=True, flip_y=False)
-            self.shoot_animation = [pygame.transform.flip(i, flip_x=True, flip_y=False) for i in self.shoot_animation]
-            self.explode_animation = [pygame.transform.flip(i, flip_x=True, flip_y=False) for i in self.explode_animation]
         elif self.facing == "right":
             self.hitbox.move_ip(-10,-20)
             self.direction = "horizontal"
             self.vel = FIREBALL_SPEED * 1
 
-    # wycinamy jeden obraz z sprite
-    def get_sprite(self, sheet, x, y, width, height, offset = 0):
-        image = pygame.Surface((width, height), pygame.SRCALPHA)
-        image.blit(sheet, (0, 0), (x * width + offset, y * height, width, height))
-        return image
-    
     # wykrywamy kolizję, i jeżeli przeszkoda ma moduł take_damage() to zabieramy mu życie
     def collision(self):
-        for sprite in self.hit_sprites:
+        for sprite in self.hit_sprites.query(self.hitbox, self.collision_mask):
             if sprite.hitbox.colliderect(self.hitbox):
+                # wyciszamy tylko własny dźwięk lotu, inne pociski grają dalej
+                if not self.collide:
+                    audio.stop("fireball", self.fireball_sound)
+                    audio.play("explosion")
+
                 self.collide = True
                 self.image_index = 0
                 self.animation_timer = 0
-                
-                self.fireball_channel.stop()
-                self.fireball_channel.play(self.explosion_sound)
 
-                if hasattr(sprite, 'take_damage'):
+                if sprite.collision_layer & LAYER_ENEMY:
                     sprite.take_damage(spell_data['fireball']['damage']*self.magic_power)
 
-    # efekt głosowy
-    def play_sound(self, sound):
-        sound.play()
-
     def update(self):
         self.current_x = self.hitbox.x
         self.current_y = self.hitbox.y
@@ -135,9 +117,16 @@ class Fireball(pygame.sprite.Sprite):
 class Laserbeam(pygame.sprite.Sprite):
     def __init__(self, pos, groups, facing, hit_sprites, magic_power) -> None:
         super().__init__(groups)
-
-        self.sprite_sheet = pygame.image.load("img/spells/laserbeam.png").convert_alpha()
-        self.image = self.get_sprite(self.sprite_sheet, 0, 0, 256, 64)
+        self.collision_layer = LAYER_PROJECTILE
+        # laserbeam przechodzi przez teren, trafia tylko przeciwników
+        self.collision_mask = LAYER_ENEMY
+
+        self.sprite_sheet = "img/spells/laserbeam.png"
+        # klatki leżą jedna pod drugą, obrócone zgodnie z kierunkiem strzału
+        rotate = {"up": 90, "down": -90}.get(facing, 0)
+        flip = facing == "left"
+        self.animation = atlas.animation(self.sprite_sheet, f"beam_{facing}", [(0, i * 64, 256, 64) for i in range(7)], flip=flip, rotate=rotate)
+        self.image = self.animation[0]
         self.rect = self.image.get_rect(topleft=pos)
         self.rect.move_ip(10, -15)
         self.hitbox = self.rect.inflate(-10,-40)
@@ -150,49 +139,30 @@ class Laserbeam(pygame.sprite.Sprite):
         self.animation_speed = 0.1
         self.animation_timer = 0
 
-        self.animation = [self.get_sprite(self.sprite_sheet, 0, i, 256, 64) for i in range(7)]
-
-        self.laserbeam_channel = pygame.mixer.Channel(3)
-        self.laserbeam_sound = pygame.mixer.Sound("sounds/effects/laserbeam.mp3")
-        self.laserbeam_sound.set_volume(0.3)
-        
-        self.laserbeam_channel.play(self.laserbeam_sound)
+        self.laserbeam_sound = audio.play("laserbeam")
 
-        # zmieniamy rotację obrazu Laserbeam, w zależności od tego w którą
-        # stronę został wystrzelony
+        # ustawiamy Laserbeam w zależności od tego, w którą stronę został wystrzelony
         if self.facing == "up":
-            self.image = pygame.transform.rotate(self.image, 90)
             self.rect = self.image.get_rect(topleft=pos)
-            self.animation = [pygame.transform.rotate(i, 90) for i in self.animation]
             self.rect.move_ip(-20, -250)
             self.hitbox = self.rect.inflate(-40,-10)
         elif self.facing == "down":
-            self.image = pygame.transform.rotate(self.image, -90)
             self.rect = self.image.get_rect(topleft=pos)
-            self.animation = [pygame.transform.rotate(i, -90) for i in self.animation]
             self.rect.move_ip(-30, 5)
             self.hitbox = self.rect.inflate(-40,-10)
         elif self.facing == "left":
-            self.image = pygame.transform.flip(self.image, flip_x=True, flip_y=False)
             self.rect = self.image.get_rect(topleft=pos)
-            self.animation = [pygame.transform.flip(i, flip_x=True, flip_y=False) for i in self.animation]
             self.rect.move_ip(-260, -20)
             self.hitbox = self.rect.inflate(-10,-40)
 
-    def get_sprite(self, sheet, x, y, width, height, offset = 0):
-        image = pygame.Surface((width, height), pygame.SRCALPHA)
-        image.blit(sheet, (0, 0), (x * width, y * height, width, height))
-        return image
-    
     # wykrywamy kolizję i zabieramy życie jeżeli trafiliśmy przeciwnika
     def collision(self):
-        for sprite in self.hit_sprites:
+        for sprite in self.hit_sprites.query(self.hitbox, self.collision_mask):
             if sprite.hitbox.colliderect(self.hitbox):
                 self.collide = True
                 print("Laser beam hits target!")
 
-                if hasattr(sprite, 'take_damage'):
-                    sprite.take_damage(spell_data['laserbeam']['damage']*self.magic_power)
+                sprite.take_damage(spell_data['laserbeam']['damage']*self.magic_power)
 
     def update(self):
         self.animation_timer += self.animation_speed
@@ -0,0 +1,92 @@
+import pygame
+from settings import *
+from dirty import dirty_rects
+from shutdown import quit_game
+
+class ScreenLoop:
+    """
+    Pętla ekranów poza rozgrywką (intro, menu). Zamiast kręcić się tak szybko, jak pozwala procesor,
+    śpi w pygame.event.wait() do pierwszego zdarzenia albo do upływu timera (np. następnej klatki filmu),
+    rysuje tylko wtedy, gdy ekran zgłosi zmianę, i nie częściej niż fps razy na sekundę.
+
+    Ekran to obiekt z metodami:
+    handle(events) - obsługuje zdarzenia, zwraca wynik różny od None, kiedy ekran się kończy,
+    changed() - czy od ostatniego rysowania zmieniło się coś widocznego,
+    draw() - rysuje ekran, zwraca False, jeżeli nie było czego wysłać do okna.
+    """
+
+    def __init__(self, fps=SCREEN_FPS) -> None:
+        self.fps = fps
+        self.clock = pygame.time.Clock()
+        # liczniki do pomiaru: ile razy pętla się obudziła i ile klatek wysłała do okna
+        self.wakeups = 0
+        self.frames = 0
+
+    def wait(self, timer=None):
+        """Śpi do pierwszego zdarzenia albo timer milisekund (None - bez limitu), zwraca wszystkie zdarzenia"""
+        if timer is None:
+            event = pygame.event.wait()
+        else:
+            event = pygame.event.wait(max(1, int(timer)))
+        self.wakeups += 1
+        events = [] if event.type == pygame.NOEVENT else [event]
+        return events + pygame.event.get()
+
+    def run(self, screen, timer=None, idle=None):
+        """Prowadzi ekran aż handle() zwróci wynik; idle() jest wywoływane po każdym obudzeniu"""
+        dirty_rects.invalidate()
+        redraw = True
+        # pierwszą klatkę rysujemy od razu, bez czekania na zdarzenie
+        events = []
+
+        while True:
+            result = screen.handle(events)
+            if result is not None:
+                return result
+
+            if redraw or screen.changed():
+                if screen.draw() is not False:
+                    dirty_rects.present()
+                    self.frames += 1
+                redraw = False
+
+            if idle:
+                idle()
+            self.clock.tick(self.fps)
+
+            events = self.wait(timer)
+            for event in events:
+                if event.type == pygame.QUIT:
+                    quit_game()
+                # okno zostało zasłonięte albo przywrócone, trzeba wysłać całą klatkę
+                elif event.type in (pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED, pygame.VIDEOEXPOSE):
+                    dirty_rects.invalidate()
+                    redraw = True
+
+class VideoScreen:
+    """Film (pyvidplayer.Video) jako ekran dla ScreenLoop, Escape go pomija"""
+
+    def __init__(self, video) -> None:
+        self.video = video
+        self.display_surface = pygame.display.get_surface()
+
+    @property
+    def timer(self):
+        # pętla budzi się co klatkę filmu
+        return self.video.frame_delay * 1000
+
+    def handle(self, events):
+        for event in events:
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                self.video.close()
+                return True
+        if not self.video.active:
+            return True
+
+    def changed(self):
+        return True
+
+    def draw(self):
+        # film zmienia cały ekran, więc zawsze wysyłamy całą klatkę
+        dirty_rects.invalidate()
+        return self.video.draw(self.display_surface, (0, 0), False)
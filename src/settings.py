@@ -1,14 +1,100 @@
 WIDTH = 1280
 HEIGTH = 720
 
+# limit klatek rysowania, symulacja ma własny stały krok
 FPS = 60
+# kroki symulacji na sekundę; prędkości i szybkości animacji niżej są podane na jeden krok
+SIMULATION_RATE = 60
+SIMULATION_STEP = 1 / SIMULATION_RATE
+# najdłuższy czas klatki (w sekundach) nadrabiany krokami symulacji, dłuższe przerwy są ucinane
+MAX_FRAME_TIME = 0.25
+# klawisze odczytywane tuż przed ostatnim krokiem symulacji w klatce, a gracz i kamera rysowani
+# w najnowszym położeniu (bez interpolacji), co skraca opóźnienie ruchu o krok symulacji
+LATE_INPUT = True
+# pomiar opóźnienia od odczytu wejścia do wysłania klatki (podsumowanie przy wyjściu)
+LATENCY_STATS = False
+# limit klatek intro i menu, które rysują się tylko po zdarzeniu albo nowej klatce filmu
+SCREEN_FPS = 30
+# co robi gra, kiedy okno straci fokus albo zostanie zminimalizowane:
+# 'pause' - pełna pauza, 'throttle' - symulacja dalej idzie w tle, a pętla budzi się BACKGROUND_FPS razy
+# na sekundę (rysuje tylko, jeżeli okno jest widoczne)
+BACKGROUND_MODE = 'pause'
+BACKGROUND_FPS = 5
+# wysyłanie do okna tylko zmienionych prostokątów zamiast całej klatki (przydatne przy renderowaniu programowym)
+DIRTY_RECTS = False
+# debugowanie: zapisywanie blitów, w których format obrazu nie pasuje do celu (raport przy wyjściu)
+FORMAT_AUDIT = False
 
 TILESIZE = 64
+# rozmiar kawałka mapy (w pikselach), do którego wypalamy statyczne warstwy
+CHUNK_SIZE = 16 * TILESIZE
+# rozmiar komórki indeksu przestrzennego i margines ekranu przy wybieraniu widocznych sprite'ów
+SPATIAL_CELL_SIZE = 4 * TILESIZE
+COLLISION_CELL_SIZE = 2 * TILESIZE
+
+# warstwy kolizji (maski bitowe), każdy obiekt kolizyjny dostaje swoją warstwę w konstruktorze
+LAYER_TERRAIN = 1
+LAYER_ENEMY = 2
+LAYER_PLAYER = 4
+LAYER_PROJECTILE = 8
+LAYER_WATER = 16
+LAYER_ALL = LAYER_TERRAIN | LAYER_ENEMY | LAYER_PLAYER | LAYER_PROJECTILE | LAYER_WATER
+# warstwy, które nigdy się nie ruszają i trafiają do mapy zajętości
+STATIC_LAYERS = LAYER_TERRAIN | LAYER_WATER
+SOLIDITY_RESOLUTION = 8
+VIEWPORT_MARGIN = TILESIZE
 
 PLAYER_SPEED = 3
 
 SPRITE_WIDTH = 64
 SPRITE_HEIGHT = 64
+# bok strony atlasu tekstur, do której pakujemy ikony HUD (klatki animacji są osobno)
+ICON_PAGE_SIZE = 256
+# katalog z gotowymi klatkami animacji (tworzony przy pierwszym uruchomieniu)
+FRAME_CACHE = True
+FRAME_CACHE_PATH = "cache"
+# ile bajtów przekształconych klatek animacji trzymamy w pamięci, najdawniej używane animacje są zwalniane
+ANIMATION_CACHE_BYTES = 16 * 1024 * 1024
+# rozmiar, w jakim gra używa każdego obrazu (None - rozmiar pliku), klucz: ścieżka. Obrazy wczytuje się
+# przez assets.image(ścieżka), a Preloader wczytuje w tle całą tabelę, więc klucze zawsze się zgadzają
+image_sizes = {
+    "img/assets/menu.png": (WIDTH, HEIGTH),
+    "img/assets/grass.png": (TILESIZE, TILESIZE),
+    "img/assets/rock.png": (24, 24),
+    "img/assets/tree1.png": (70, 80),
+    "img/assets/tree2.png": (32, 16),
+    "img/assets/decor.png": (64, 64),
+    "img/assets/krzew.png": (32, 32),
+    "img/assets/tablica.png": (32, 32),
+    "img/assets/head.png": (24, 24),
+    # arkusze animacji (pomijane, jeżeli są w cache klatek)
+    "img/assets/playersprite.png": None,
+    "img/assets/skeleton.png": None,
+    "img/assets/slime.png": None,
+    "img/assets/night.png": None,
+    "img/assets/portal.png": None,
+    "img/assets/water-sheet.png": None,
+    "img/assets/blood.png": None,
+    "img/spells/heal.png": None,
+    "img/spells/fireball.png": None,
+    "img/spells/laserbeam.png": None,
+    # ikony HUD
+    "img/spells/fireballicon.png": (64, 64),
+    "img/spells/laserbeamicon.png": (64, 64),
+    "img/spells/healicon.png": (64, 64),
+    "img/staticons/statup.png": None,
+    "img/staticons/healthicon.png": None,
+    "img/staticons/healthregenicon.png": None,
+    "img/staticons/manaicon.png": None,
+    "img/staticons/manaregenicon.png": None,
+    "img/staticons/strenghticon.png": None,
+    "img/staticons/speedicon.png": None,
+}
+# obrazy wczytywane w tle w czasie filmu intro: (ścieżka, rozmiar, w jakim gra ich używa)
+PRELOAD_IMAGES = list(image_sizes.items())
+PRELOAD_WORKERS = 4
+# ile milisekund klatki intro główny wątek może poświęcić na tworzenie powierzchni z wczytanych obrazów
+PRELOAD_FRAME_BUDGET = 4
 
 FIREBALL_DELAY = 1
 
@@ -28,6 +114,10 @@ SPELL_BOX_SIZE = 70
 STAT_BOX_SIZE = 50
 UI_FONT = 'img/font/Lora.ttf'
 UI_FONT_SIZE = 22
+# ile wyrenderowanych napisów trzymamy w pamięci
+TEXT_CACHE_SIZE = 256
+# znaki, z których składamy liczby w HUD (atlas znaków)
+GLYPH_CHARACTERS = '0123456789/+-.:% xpslv'
 SPELL_FONT = 'img/font/Lora-Bold.ttf'
 
 # kolory
@@ -50,6 +140,19 @@ spell_data = {
     'heal': {'cooldown': 20000, 'heal_percent': 0.2, 'mana': 30,'img': 'img/spells/healicon.png'}
 }
 
+# efekty głosowe (priority: im wyższy, tym trudniej zagłuszyć dźwięk innym)
+SOUND_EFFECTS_PATH = 'sounds/effects'
+VOICE_COUNT = 8
+
+sound_data = {
+    'footsteps': {'volume': 0.1, 'priority': 0},
+    'fireball': {'volume': 0.3, 'priority': 1},
+    'explosion': {'volume': 0.3, 'priority': 1},
+    'laserbeam': {'volume': 0.3, 'priority': 2},
+    'damage': {'volume': 0.1, 'priority': 2},
+    'death': {'volume': 0.1, 'priority': 3}
+}
+
 ##SLIME
 slime_width = 32
 slime_height = 32
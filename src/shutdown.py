@@ -0,0 +1,10 @@
+import sys
+import pygame
+from framecache import frame_cache
+
+def quit_game():
+    """Jedyne wyjście z gry (okno, menu, intro): zapisuje nowe klatki do cache i zamyka pygame"""
+    # animacje wycięte w trakcie gry też trafiają do cache na następny start
+    frame_cache.save()
+    pygame.quit()
+    sys.exit()
@@ -0,0 +1,291 @@
+import pygame
+from bisect import bisect_left, insort
+from settings import *
+
+class SpatialHash:
+    """
+    Indeks przestrzenny: świat jest podzielony na kwadratowe komórki o boku cell_size,
+    a każdy obiekt jest zapisany w komórkach, na które zachodzi jego prostokąt.
+    Zapytanie o obszar sprawdza tylko kilka komórek zamiast wszystkich obiektów.
+    """
+
+    def __init__(self, cell_size=SPATIAL_CELL_SIZE) -> None:
+        self.cell_size = cell_size
+        # klucz: (kolumna, wiersz) komórki, wartość: zbiór obiektów
+        self.cells = {}
+        # zakres komórek zajmowanych przez każdy obiekt
+        self.items = {}
+
+    def cell_range(self, rect):
+        # niektóre hitboxy mają ujemny rozmiar (inflate o więcej niż rozmiar obrazka),
+        # a colliderect i tak traktuje je jak znormalizowane
+        if rect.width < 0 or rect.height < 0:
+            rect = rect.copy()
+            rect.normalize()
+        size = self.cell_size
+        return (rect.left // size, rect.top // size, max(rect.left, rect.right - 1) // size, max(rect.top, rect.bottom - 1) // size)
+
+    def insert(self, item, rect):
+        cell_range = self.cell_range(rect)
+        self.items[item] = cell_range
+        first_col, first_row, last_col, last_row = cell_range
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                self.cells.setdefault((col, row), set()).add(item)
+
+    def remove(self, item):
+        cell_range = self.items.pop(item, None)
+        if cell_range is None:
+            return
+        first_col, first_row, last_col, last_row = cell_range
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                cell = self.cells[(col, row)]
+                cell.discard(item)
+                if not cell:
+                    del self.cells[(col, row)]
+
+    def move(self, item, rect):
+        """Aktualizuje położenie obiektu, przepisując go tylko gdy zmienił komórki"""
+        if self.items.get(item) != self.cell_range(rect):
+            self.remove(item)
+            self.insert(item, rect)
+
+    def query(self, rect):
+        """Zwraca zbiór obiektów z komórek, na które zachodzi prostokąt"""
+        found = set()
+        first_col, first_row, last_col, last_row = self.cell_range(rect)
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                cell = self.cells.get((col, row))
+                if cell:
+                    found.update(cell)
+        return found
+
+    def __contains__(self, item):
+        return item in self.items
+
+    def __len__(self):
+        return len(self.items)
+
+class CollisionGroup(pygame.sprite.Group):
+    """
+    Grupa przeszkód, której sprite'y są zapisane w siatce komórek według hitboxów,
+    osobnej dla każdej warstwy kolizji (collision_layer). Ruchome obiekty po przesunięciu
+    hitboxa wywołują move(), a zapytanie sprawdza tylko kilka sąsiednich komórek
+    i tylko w warstwach pasujących do maski.
+    """
+
+    def __init__(self, cell_size=COLLISION_CELL_SIZE) -> None:
+        super().__init__()
+        self.cell_size = cell_size
+        # klucz: warstwa kolizji, wartość: jej siatka
+        self.indices = {}
+        # sprite'y dodane w Sprite.__init__, zanim ustawiły swój hitbox
+        self.unindexed = set()
+        # mapa zajętości nieruchomego terenu, ustawiana przez Level.create_map()
+        self.solidity = None
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        self.unindexed.add(sprite)
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        self.unindexed.discard(sprite)
+        if hasattr(sprite, 'collision_layer') and sprite.collision_layer in self.indices:
+            self.indices[sprite.collision_layer].remove(sprite)
+
+    def index_new_sprites(self):
+        if not self.unindexed:
+            return
+        for sprite in self.unindexed:
+            if hasattr(sprite, 'hitbox'):
+                if sprite.collision_layer not in self.indices:
+                    self.indices[sprite.collision_layer] = SpatialHash(self.cell_size)
+                self.indices[sprite.collision_layer].insert(sprite, sprite.hitbox)
+                if self.solidity and sprite.collision_layer & STATIC_LAYERS:
+                    self.solidity.add(sprite.hitbox)
+        # nowy zbiór, bo opróżniony duży zbiór nadal jest wolny w iteracji
+        self.unindexed = {sprite for sprite in self.unindexed if not hasattr(sprite, 'hitbox')}
+
+    def set_solidity(self, solidity):
+        """Wypełnia mapę zajętości hitboxami nieruchomych warstw i używa jej w zapytaniach"""
+        self.index_new_sprites()
+        for layer, index in self.indices.items():
+            if layer & STATIC_LAYERS:
+                for sprite in index.items:
+                    solidity.add(sprite.hitbox)
+        self.solidity = solidity
+
+    def move(self, sprite):
+        """Wywoływane przez sprite po zmianie jego hitboxa"""
+        index = self.indices.get(sprite.collision_layer)
+        if index and sprite in index:
+            index.move(sprite, sprite.hitbox)
+
+    def query(self, rect, mask=LAYER_ALL):
+        """Zwraca sprite'y z warstw pasujących do maski, których hitbox koliduje z prostokątem"""
+        self.index_new_sprites()
+        # jeżeli w mapie zajętości nic tu nie ma, pomijamy warstwy nieruchomego terenu
+        if self.solidity and not self.solidity.collide_rect(rect):
+            mask &= ~STATIC_LAYERS
+        found = []
+        for layer, index in self.indices.items():
+            if layer & mask:
+                found.extend(sprite for sprite in index.query(rect) if sprite.hitbox.colliderect(rect))
+        return found
+
+class SolidityGrid:
+    """
+    Mapa zajętości nieruchomego terenu w rozdzielczości resolution pikseli, trzymana
+    w bytearray (1 - zajęte). Komórka jest zajęta, jeżeli choć częściowo pokrywa ją hitbox,
+    więc brak kolizji w mapie oznacza brak kolizji z terenem. Obszar poza mapą traktujemy
+    jak zajęty, bo część kafelków wystaje poza MAP_WIDTH.
+    """
+
+    def __init__(self, width=MAP_WIDTH, height=MAP_HEIGHT, resolution=SOLIDITY_RESOLUTION) -> None:
+        self.resolution = resolution
+        self.cols = -(-width // resolution)
+        self.rows = -(-height // resolution)
+        self.cells = bytearray(self.cols * self.rows)
+
+    def cell_span(self, rect):
+        """Zwraca zakres komórek pod prostokątem, przycięty do mapy (None jeżeli jest poza nią)"""
+        if rect.width < 0 or rect.height < 0:
+            rect = rect.copy()
+            rect.normalize()
+        if rect.width == 0 or rect.height == 0:
+            return None
+        first_col = max(0, rect.left // self.resolution)
+        first_row = max(0, rect.top // self.resolution)
+        last_col = min(self.cols - 1, (rect.right - 1) // self.resolution)
+        last_row = min(self.rows - 1, (rect.bottom - 1) // self.resolution)
+        if first_col > last_col or first_row > last_row:
+            return None
+        return first_col, first_row, last_col, last_row
+
+    def add(self, rect):
+        span = self.cell_span(rect)
+        if span is None:
+            return
+        first_col, first_row, last_col, last_row = span
+        for row in range(first_row, last_row + 1):
+            start = row * self.cols
+            self.cells[start + first_col:start + last_col + 1] = b'\x01' * (last_col - first_col + 1)
+
+    def contains(self, rect):
+        return rect.left >= 0 and rect.top >= 0 and rect.right <= self.cols * self.resolution and rect.bottom <= self.rows * self.resolution
+
+    def collide_rect(self, rect):
+        if rect.width < 0 or rect.height < 0:
+            rect = rect.copy()
+            rect.normalize()
+        if rect.width == 0 or rect.height == 0:
+            return False
+        # prostokąt choć częściowo poza mapą (także cały za jej brzegiem) traktujemy jak kolizję,
+        # bo przeszkody wystające poza mapę nie są zapisane w komórkach
+        if not self.contains(rect):
+            return True
+        first_col, first_row, last_col, last_row = self.cell_span(rect)
+        for row in range(first_row, last_row + 1):
+            start = row * self.cols
+            if self.cells.find(1, start + first_col, start + last_col + 1) != -1:
+                return True
+        return False
+
+class DrawOrder:
+    """
+    Kolejność rysowania sprite'ów według rect.centery, utrzymywana między klatkami.
+    Sprite'y trzymamy w kubełkach (jeden na wiersz kafelków), posortowanych przez wstawianie,
+    więc przestawiamy tylko te sprite'y, które zmieniły wysokość.
+    """
+
+    def __init__(self, row_height=TILESIZE) -> None:
+        self.row_height = row_height
+        # klucz: numer wiersza, wartość: posortowana lista wpisów (centery, numer, sprite)
+        self.rows = {}
+        self.entries = {}
+        # numer wstawienia rozstrzyga remisy tak samo jak stabilne sortowanie grupy
+        self.count = 0
+
+    def insert(self, sprite, number=None):
+        if number is None:
+            number = self.count
+            self.count += 1
+        entry = (sprite.rect.centery, number, sprite)
+        self.entries[sprite] = entry
+        insort(self.rows.setdefault(entry[0] // self.row_height, []), entry)
+
+    def remove(self, sprite):
+        entry = self.entries.pop(sprite, None)
+        if entry is None:
+            return
+        row = entry[0] // self.row_height
+        bucket = self.rows[row]
+        del bucket[bisect_left(bucket, entry)]
+        if not bucket:
+            del self.rows[row]
+
+    def move(self, sprite):
+        """Przestawia sprite tylko wtedy, gdy zmienił się jego centery"""
+        entry = self.entries[sprite]
+        if entry[0] != sprite.rect.centery:
+            self.remove(sprite)
+            self.insert(sprite, entry[1])
+
+    def ordered(self, sprites):
+        """Zwraca podane sprite'y (np. widoczne na ekranie) w kolejności rysowania"""
+        rows = [self.entries[sprite][0] // self.row_height for sprite in sprites if sprite in self.entries]
+        if not rows:
+            return []
+        first_row, last_row = min(rows), max(rows)
+        ordered = []
+        for row in range(first_row, last_row + 1):
+            for entry in self.rows.get(row, ()):
+                if entry[2] in sprites:
+                    ordered.append(entry[2])
+        return ordered
+
+    def __contains__(self, sprite):
+        return sprite in self.entries
+
+
+# pomiar: koszt jednego zapytania o kolizję przy rosnącej liczbie przeszkód
+# uruchomienie: python src/spatial.py
+if __name__ == "__main__":
+    import random
+    from timeit import timeit
+
+    class Obstacle(pygame.sprite.Sprite):
+        def __init__(self, groups, pos) -> None:
+            super().__init__(groups)
+            self.collision_layer = LAYER_TERRAIN
+            self.hitbox = pygame.Rect(pos, (TILESIZE - 20, TILESIZE - 20))
+
+    random.seed(0)
+    hitbox = pygame.Rect(0, 0, 34, 44)
+    print(f"{'obstacles':>10} {'linear scan (us)':>18} {'grid query (us)':>16}")
+    for count in (150, 1000, 10000):
+        side = int(count ** 0.5) + 1
+        group = CollisionGroup()
+        for i in range(count):
+            Obstacle(group, ((i % side) * TILESIZE, (i // side) * TILESIZE))
+        positions = [(random.randrange(side * TILESIZE), random.randrange(side * TILESIZE)) for _ in range(1000)]
+        # pierwsze zapytanie buduje indeks, tego nie mierzymy
+        group.query(hitbox)
+
+        def linear():
+            for pos in positions:
+                hitbox.topleft = pos
+                [sprite for sprite in group if sprite.hitbox.colliderect(hitbox)]
+
+        def grid():
+            for pos in positions:
+                hitbox.topleft = pos
+                group.query(hitbox)
+
+        runs = 3
+        linear_time = timeit(linear, number=runs) / (runs * len(positions)) * 1e6
+        grid_time = timeit(grid, number=runs) / (runs * len(positions)) * 1e6
+        print(f"{count:>10} {linear_time:>18.2f} {grid_time:>16.2f}")
@@ -0,0 +1,93 @@
+import pygame
+from collections import OrderedDict
+from settings import *
+
+class TextCache:
+    """
+    Pamięć podręczna wyrenderowanych napisów (LRU). Napis o tej samej czcionce, treści,
+    antyaliasingu i kolorze renderujemy tylko raz, dopóki nie wypadnie z pamięci.
+    Zwrócona powierzchnia jest współdzielona, więc nie wolno jej zmieniać.
+    """
+
+    def __init__(self, size=TEXT_CACHE_SIZE) -> None:
+        self.size = size
+        self.surfaces = OrderedDict()
+        # atlasy znaków dla często zmieniających się liczb, klucz: (czcionka, antyaliasing, kolor)
+        self.atlases = {}
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, antialias, color):
+        key = (font, text, antialias, tuple(pygame.Color(color)))
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        # napisy bez antyaliasingu są 8-bitowe, więc konwertujemy je do formatu ekranu
+        if pygame.display.get_surface():
+            surface = surface.convert_alpha()
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.size:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def glyphs(self, font, antialias, color):
+        """Zwraca atlas znaków dla danej czcionki i koloru, tworząc go przy pierwszym użyciu"""
+        key = (font, antialias, tuple(pygame.Color(color)))
+        if key not in self.atlases:
+            self.atlases[key] = GlyphAtlas(font, antialias, color)
+        return self.atlases[key]
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hit_rate(), 'surfaces': len(self.surfaces)}
+
+class GlyphAtlas:
+    """
+    Atlas znaków do rysowania szybko zmieniających się liczb (np. "87/100", "+50xp", "12").
+    Każdy znak z GLYPH_CHARACTERS jest renderowany raz do jednej powierzchni, a napis
+    składamy z jej fragmentów (subsurface), bez renderowania czcionki w każdej klatce.
+    """
+
+    def __init__(self, font, antialias, color, characters=GLYPH_CHARACTERS) -> None:
+        self.height = font.get_height()
+
+        rendered = [font.render(char, antialias, color) for char in characters]
+        width = sum(glyph.get_width() for glyph in rendered)
+        self.surface = pygame.Surface((max(width, 1), self.height), pygame.SRCALPHA)
+
+        self.glyphs = {}
+        x = 0
+        for char, glyph in zip(characters, rendered):
+            self.surface.blit(glyph, (x, 0))
+            self.glyphs[char] = self.surface.subsurface((x, 0, glyph.get_width(), self.height))
+            x += glyph.get_width()
+
+    def size(self, text):
+        return sum(self.glyphs[char].get_width() for char in text), self.height
+
+    def get_rect(self, text, **kwargs):
+        """Działa jak Surface.get_rect(), np. get_rect("87/100", topright=(200, 10))"""
+        rect = pygame.Rect((0, 0), self.size(text))
+        for name, value in kwargs.items():
+            setattr(rect, name, value)
+        return rect
+
+    def draw(self, surface, text, pos):
+        x, y = pos
+        blits = []
+        for char in text:
+            glyph = self.glyphs[char]
+            blits.append((glyph, (x, y)))
+            x += glyph.get_width()
+        surface.blits(blits, doreturn=False)
+
+# wspólna instancja dla całej gry
+text_cache = TextCache()
@@ -1,43 +1,38 @@
 import pygame
 from settings import *
+from assets import assets
 
 class Tile(pygame.sprite.Sprite):
     def __init__(self, pos, groups, tile_type, layer=0):
         super().__init__(groups)
+        self.collision_layer = LAYER_TERRAIN
         if tile_type == 'rock':
-            self.image = pygame.image.load("img/assets/rock.png").convert_alpha()
-            self.image = pygame.transform.scale(self.image, (24,24))
+            self.image = assets.image("img/assets/rock.png")
             self.rect = self.image.get_rect(topleft=pos)
             self.hitbox = self.rect.inflate(-5,-5)
         elif tile_type == 'tree1':
-            self.image = pygame.image.load("img/assets/tree1.png").convert_alpha()
-            self.image = pygame.transform.scale(self.image, (70,80))
+            self.image = assets.image("img/assets/tree1.png")
             self.rect = self.image.get_rect(topleft=pos)
             self.hitbox = self.rect.inflate(-40,-40)
         elif tile_type == 'tree2':
-            self.image = pygame.image.load("img/assets/tree2.png").convert_alpha()
-            self.image = pygame.transform.scale(self.image, (32,16))
+            self.image = assets.image("img/assets/tree2.png")
             self.rect = self.image.get_rect(topleft=pos)
             self.hitbox = self.rect.inflate(-5,-20)
         elif tile_type == 'decor':
             self.is_decor = True
-            self.image = pygame.image.load("img/assets/decor.png").convert_alpha()
-            self.image = pygame.transform.scale(self.image, (64,64))
+            self.image = assets.image("img/assets/decor.png")
             self.rect = self.image.get_rect(topleft=pos)
             self.hitbox = self.rect.inflate(-5,-5)
         elif tile_type == 'krzew':
-            self.image = pygame.image.load("img/assets/krzew.png").convert_alpha()
-            self.image = pygame.transform.scale(self.image, (32,32))
+            self.image = assets.image("img/assets/krzew.png")
             self.rect = self.image.get_rect(topleft=pos)
             self.hitbox = self.rect.inflate(-5,-5)
         elif tile_type == 'tablica':
-            self.image = pygame.image.load("img/assets/tablica.png").convert_alpha()
-            self.image = pygame.transform.scale(self.image, (32,32))
+            self.image = assets.image("img/assets/tablica.png")
             self.rect = self.image.get_rect(topleft=pos)
             self.hitbox = self.rect.inflate(-5,-5)
         elif tile_type == 'head':
-            self.image = pygame.image.load("img/assets/head.png").convert_alpha()
-            self.image = pygame.transform.scale(self.image, (24,24))
+            self.image = assets.image("img/assets/head.png")
             self.rect = self.image.get_rect(topleft=pos)
             self.hitbox = self.rect.inflate(-5,-5)
 
@@ -2,22 +2,45 @@ import pygame
 import pygame.locals
 from settings import *
 from projectile import *
-import sys
+from assets import assets
+from atlas import atlas
+from text import text_cache
+from dirty import dirty_rects
+from shutdown import quit_game
+
+class Widget:
+    """
+    Element HUD (pasek, spell box, ikona statystyki itd.). state(player) zwraca wartości pól gracza,
+    od których zależy jego wygląd, a draw(surface, state) rysuje go na powierzchni HUD.
+    Widget jest rysowany ponownie tylko wtedy, gdy jego stan się zmienił.
+    """
+
+    def __init__(self, rect, state, draw) -> None:
+        self.rect = rect
+        self.state = state
+        self.draw = draw
+        self.last_state = None
+        self.dirty = True
 
 class UI:
     """
     Klasa odpowiedzialna za rysowanie elementów UI w tym health i mana bar, exp bar,
-    umiejętności, skille i więcej.
+    umiejętności, skille i więcej. Elementy są rysowane do jednej powierzchni HUD,
+    którą co klatkę nakładamy na ekran.
     """
 
     def __init__(self) -> None:
         
         self.display_surface = pygame.display.get_surface()
-        self.exp_font = pygame.font.Font(UI_FONT, UI_FONT_SIZE)
-        self.bar_font = pygame.font.Font(UI_FONT, 14)
-        self.user_font = pygame.font.Font(SPELL_FONT, 14)
-        self.spell_font = pygame.font.Font(SPELL_FONT, 20)
-        self.cooldown_font = pygame.font.FontType(UI_FONT, 28)
+        self.exp_font = assets.load_font(UI_FONT, UI_FONT_SIZE)
+        self.bar_font = assets.load_font(UI_FONT, 14)
+        self.user_font = assets.load_font(SPELL_FONT, 14)
+        self.spell_font = assets.load_font(SPELL_FONT, 20)
+        self.cooldown_font = assets.load_font(UI_FONT, 28)
+
+        # liczby w HUD zmieniają się co chwilę, więc składamy je z atlasu znaków
+        self.bar_glyphs = text_cache.glyphs(self.bar_font, False, TEXT_COLOR)
+        self.cooldown_glyphs = text_cache.glyphs(self.cooldown_font, False, COOLDOWN_COLOR)
 
         # tworzymy prostokąty które będziemy podawać do metod rysujących
         self.health_bar_rect = pygame.Rect(10, 10, HEALTH_BAR_WIDTH, BAR_HEIGHT)
@@ -28,146 +51,168 @@ class UI:
 
         self.mouse_was_pressed = False
 
+        # ikony zaklęć z podpisem klawisza i kosztem many, oraz ich szare wersje na czas cooldownu,
+        # przygotowywane raz zamiast co klatkę
         self.spell_img = []
+        self.spell_img_gray = []
+
+        for button, (name, spell) in zip(("Space", "Q", "E"), spell_data.items()):
+            spell_img = assets.image(spell['img']).copy()
+            button_key = text_cache.render(self.spell_font, button, False, 'white')
+            mana_cost = text_cache.render(self.spell_font, str(spell['mana']), False, "white")
+            spell_img.blit(button_key, (5, 0))
+            spell_img.blit(mana_cost, mana_cost.get_rect(bottomright = spell_img.get_rect().bottomright))
+            self.spell_img.append(spell_img)
+            self.spell_img_gray.append(pygame.transform.grayscale(spell_img))
+
+        self.upgrade_img = atlas.image("img/staticons/statup.png")
+
+        # powierzchnia HUD, przezroczysta poza widgetami
+        self.hud_surface = pygame.Surface(self.display_surface.get_size(), pygame.SRCALPHA).convert_alpha()
+        self.widgets = []
+        self.create_widgets()
+        # jeden wpis na widget, cały HUD rysujemy jednym wywołaniem blits()
+        self.blit_sequence = [(self.hud_surface, widget.rect.topleft, widget.rect) for widget in self.widgets]
+
+    def create_widgets(self):
+        # paski zależą od szerokości wypełnienia i liczb w podpisie
+        self.widgets.append(Widget(self.health_bar_rect,
+            lambda player: self.bar_state(player.health, player.stats['health'], self.health_bar_rect),
+            lambda surface, state: self.show_bar(surface, state, self.health_bar_rect, HEALTH_COLOR)))
+        self.widgets.append(Widget(self.mana_bar_rect,
+            lambda player: self.bar_state(player.mana, player.stats['mana'], self.mana_bar_rect),
+            lambda surface, state: self.show_bar(surface, state, self.mana_bar_rect, MANA_COLOR)))
+        self.widgets.append(Widget(self.experience_rect,
+            lambda player: self.bar_state(player.exp, player.next_level_exp, self.experience_rect),
+            lambda surface, state: self.show_exp(surface, state, self.experience_rect, EXP_COLOR)))
+
+        # spell boxy zależą od flagi cooldownu i pozostałego czasu (fireball nie pokazuje czasu)
+        spells = [('fireball', 'fireball_cooldown', False), ('laserbeam', 'laserbeam_cooldown', True), ('heal', 'heal_cooldown', True)]
+        for index, (name, cooldown, show_time) in enumerate(spells):
+            bg_rect = pygame.Rect(10 + index * (SPELL_BOX_SIZE + 10), 640, SPELL_BOX_SIZE, SPELL_BOX_SIZE)
+            self.widgets.append(Widget(bg_rect,
+                lambda player, name=name, cooldown=cooldown, show_time=show_time: self.spell_state(player, name, cooldown, show_time),
+                lambda surface, state, index=index, bg_rect=bg_rect: self.spell_box(surface, state, bg_rect, index)))
+
+        # ikony statystyk się nie zmieniają, a przycisk ulepszania zależy od ability_points i poziomu statystyki
+        stats = [("health", "img/staticons/healthicon.png"), ("health_regen", "img/staticons/healthregenicon.png"),
+                 ("mana", "img/staticons/manaicon.png"), ("mana_regen", "img/staticons/manaregenicon.png"),
+                 ("magic", "img/staticons/strenghticon.png"), ("speed", "img/staticons/speedicon.png")]
+        upgrade_offsets = (6, 13, 18, 23, 28, 33)
+        self.upgrade_widgets = {}
+        for index, (skill, path) in enumerate(stats):
+            bg_rect = pygame.Rect(self.stat_box_x + index * (STAT_BOX_SIZE + 5), 660, STAT_BOX_SIZE, STAT_BOX_SIZE)
+            self.widgets.append(Widget(bg_rect, lambda player: None,
+                lambda surface, state, bg_rect=bg_rect, path=path: self.stat_box(surface, bg_rect, path)))
+
+            img_rect = self.upgrade_img.get_rect(topleft = (self.stat_box_x + index * STAT_BOX_SIZE + upgrade_offsets[index], 625))
+            widget = Widget(img_rect,
+                lambda player, skill=skill: player.ability_points > 0 and player.stats[skill] < player.max_stats[skill],
+                lambda surface, state, img_rect=img_rect: self.upgrade_box(surface, state, img_rect))
+            self.widgets.append(widget)
+            self.upgrade_widgets[skill] = widget
+
+    def bar_state(self, current, max_amount, bg_rect):
+        # zmiana statów na piksele (Rect zaokrągla szerokość tak samo jak przy rysowaniu)
+        current_rect = bg_rect.copy()
+        current_rect.width = bg_rect.width * current / max_amount
+        return current_rect.width, int(current), int(max_amount)
 
-        for spell in spell_data.values():
-            path = spell['img']
-            spell = pygame.image.load(path).convert_alpha()
-            spell = pygame.transform.scale(spell, (64,64))
-            self.spell_img.append(spell)
+    def spell_state(self, player, name, cooldown, show_time):
+        if not getattr(player, cooldown):
+            return False, None
+        return True, player.get_cooldown_time(name) if show_time else None
 
     # metoda odpowiedzialna za rysowanie health oraz mana bar
-    def show_bar(self, current, max_amount, bg_rect, color):
+    def show_bar(self, surface, state, bg_rect, color):
+        current_width, current, max_amount = state
         # rysowanie tła
-        pygame.draw.rect(self.display_surface, UI_BG_COLOR, bg_rect)
+        pygame.draw.rect(surface, UI_BG_COLOR, bg_rect)
 
-        # zmiana statów na piksele
-        ratio = current / max_amount
-        current_width = bg_rect.width * ratio
         current_rect = bg_rect.copy()
         current_rect.width = current_width
 
-        text_surf = self.bar_font.render(str(str(int(current))+"/"+str(int(max_amount))), False, TEXT_COLOR)
-        text_rect = text_surf.get_rect()
-        text_rect.topright = bg_rect.topright
+        text = str(current)+"/"+str(max_amount)
+        text_rect = self.bar_glyphs.get_rect(text, topright = bg_rect.topright)
         
-        pygame.draw.rect(self.display_surface, color, current_rect)
-        pygame.draw.rect(self.display_surface, UI_BORDER_COLOR, bg_rect, 3)
+        pygame.draw.rect(surface, color, current_rect)
+        pygame.draw.rect(surface, UI_BORDER_COLOR, bg_rect, 3)
 
-        self.display_surface.blit(text_surf, text_rect)
+        self.bar_glyphs.draw(surface, text, text_rect.topleft)
 
     # metoda odpowiedzialna za rysowanie exp bar
-    def show_exp(self, exp, max_exp, bg_rect, color):
-        pygame.draw.rect(self.display_surface, UI_BG_COLOR, bg_rect)
+    def show_exp(self, surface, state, bg_rect, color):
+        current_width, exp, max_exp = state
+        pygame.draw.rect(surface, UI_BG_COLOR, bg_rect)
 
-        # zmiana statów na piksele
-        ratio = exp / max_exp
-        current_width = bg_rect.width * ratio
         current_rect = bg_rect.copy()
         current_rect.width = current_width
 
-        text_surf = self.bar_font.render(str(str(int(exp))+"/"+str(int(max_exp))), False, TEXT_COLOR)
-        text_rect = text_surf.get_rect()
-        text_rect.center = bg_rect.center
+        text = str(exp)+"/"+str(max_exp)
+        text_rect = self.bar_glyphs.get_rect(text, center = bg_rect.center)
         
-        pygame.draw.rect(self.display_surface, color, current_rect)
-        pygame.draw.rect(self.display_surface, UI_BORDER_COLOR, bg_rect, 3)
+        pygame.draw.rect(surface, color, current_rect)
+        pygame.draw.rect(surface, UI_BORDER_COLOR, bg_rect, 3)
 
-        self.display_surface.blit(text_surf, text_rect)
+        self.bar_glyphs.draw(surface, text, text_rect.topleft)
 
     # metoda odpowiedzialna za rysowanie spell boxów, cooldown, mana_cost itd.
-    def spell_box(self, left, top, spell_img, cooldown, button, mana_cost, time = None):
-        bg_rect = pygame.Rect(left, top, SPELL_BOX_SIZE, SPELL_BOX_SIZE)
+    def spell_box(self, surface, state, bg_rect, index):
+        cooldown, time = state
 
-        pygame.draw.rect(self.display_surface, UI_BG_COLOR, bg_rect)
-        pygame.draw.rect(self.display_surface, UI_BORDER_COLOR, bg_rect, 3)
+        pygame.draw.rect(surface, UI_BG_COLOR, bg_rect)
+        pygame.draw.rect(surface, UI_BORDER_COLOR, bg_rect, 3)
 
+        spell_img = self.spell_img_gray[index] if cooldown else self.spell_img[index]
         spell_rect = spell_img.get_rect(center = bg_rect.center)
+        surface.blit(spell_img, spell_rect)
 
-        # renderowanie przycisku zaklęcia na obrazie
-        button_key = self.spell_font.render(button, False, 'white')
-        
-        mana_cost = self.spell_font.render(str(mana_cost), False, "white")
-        mana_cost_rect = mana_cost.get_rect()
-        mana_cost_rect.bottomright = spell_img.get_rect().bottomright
-
-        if cooldown:
-            spell_img = pygame.transform.grayscale(spell_img)
-            # renderowanie pozostałego czasu cooldownu
-            if time:
-                cooldown_time = self.cooldown_font.render(time, False, COOLDOWN_COLOR)
-                cooldown_rect = cooldown_time.get_rect()
-                cooldown_rect.center = spell_img.get_rect().center
-                spell_img.blit(cooldown_time, cooldown_rect)
-
-                button_key.set_colorkey('red')
-        
-        self.display_surface.blit(spell_img, spell_rect)
-        spell_img.blit(button_key, (5, 0))
-        spell_img.blit(mana_cost, mana_cost_rect)
+        # renderowanie pozostałego czasu cooldownu
+        if time:
+            cooldown_rect = self.cooldown_glyphs.get_rect(time, center = spell_rect.center)
+            self.cooldown_glyphs.draw(surface, time, cooldown_rect.topleft)
 
     # metoda odpowiedzialna za rysowanie umiejętności gracza
-    def stat_box(self, left, top, stat_name, path):
-        bg_rect = pygame.Rect(left, top, STAT_BOX_SIZE, STAT_BOX_SIZE)
-        stat_img = pygame.image.load(path)
+    def stat_box(self, surface, bg_rect, path):
+        stat_img = atlas.image(path)
         stat_rect = stat_img.get_rect(center = bg_rect.center)
 
-        pygame.draw.rect(self.display_surface, UI_BG_COLOR, bg_rect)
-        pygame.draw.rect(self.display_surface, UI_BORDER_COLOR, bg_rect, 3)
+        pygame.draw.rect(surface, UI_BG_COLOR, bg_rect)
+        pygame.draw.rect(surface, UI_BORDER_COLOR, bg_rect, 3)
 
-        self.display_surface.blit(stat_img, stat_rect)
+        surface.blit(stat_img, stat_rect)
     
-    # metoda rysuje obraz ulepszania, oraz umożliwia ulepszenie umiejętności
-    def upgrade_box(self, pos, skill, player):
-        path = "img/staticons/statup.png"
-        image = pygame.image.load(path).convert_alpha()
-        img_rect = image.get_rect(topleft = pos)
-
-        self.display_surface.blit(image, img_rect)
+    # metoda rysuje obraz ulepszania (jeżeli gracz może ulepszyć daną umiejętność)
+    def upgrade_box(self, surface, visible, img_rect):
+        if visible:
+            surface.blit(self.upgrade_img, img_rect)
 
+    # ulepszenie umiejętności po kliknięciu widocznego przycisku
+    def upgrade_click(self, player):
+        self.mouse_clicked = pygame.mouse.get_pressed()[0]
         if self.mouse_clicked and not self.mouse_was_pressed:
             x,y = pygame.mouse.get_pos()
-            if img_rect.collidepoint(x, y):
-                player.upgrade(skill)
-                print("upgrade")
+            for skill, widget in self.upgrade_widgets.items():
+                if widget.last_state and widget.rect.collidepoint(x, y):
+                    player.upgrade(skill)
+                    print("upgrade")
+        self.mouse_was_pressed = self.mouse_clicked
 
+    # rysuje ponownie tylko widgety, których stan się zmienił
+    def update_hud(self, player):
+        for widget in self.widgets:
+            state = widget.state(player)
+            if widget.dirty or state != widget.last_state:
+                self.hud_surface.fill((0, 0, 0, 0), widget.rect)
+                widget.draw(self.hud_surface, state)
+                dirty_rects.add(widget.rect)
+                widget.last_state = state
+                widget.dirty = False
 
     def display(self, player):
-
-        self.show_bar(player.health, player.stats['health'], self.health_bar_rect, HEALTH_COLOR)
-        self.show_bar(player.mana, player.stats['mana'], self.mana_bar_rect, MANA_COLOR)
-
-        self.show_exp(player.exp, player.next_level_exp, self.experience_rect, EXP_COLOR)
-
-        self.spell_box(10, 640, self.spell_img[0], player.fireball_cooldown, "Space", spell_data["fireball"]["mana"])
-        self.spell_box(SPELL_BOX_SIZE + 20, 640, self.spell_img[1], player.laserbeam_cooldown, "Q", spell_data["laserbeam"]["mana"],  player.get_cooldown_time("laserbeam"))
-        self.spell_box(2*SPELL_BOX_SIZE + 30, 640, self.spell_img[2], player.heal_cooldown, "E", spell_data["heal"]["mana"], player.get_cooldown_time("heal"))
-
-        self.stat_box(self.stat_box_x, 660, "Health", "img/staticons/healthicon.png")
-        self.stat_box(self.stat_box_x + STAT_BOX_SIZE + 5, 660, "Health Regen", "img/staticons/healthregenicon.png")
-        self.stat_box(self.stat_box_x + 2*STAT_BOX_SIZE + 10, 660, "Mana", "img/staticons/manaicon.png")
-        self.stat_box(self.stat_box_x + 3*STAT_BOX_SIZE + 15, 660, "Mana Regen", "img/staticons/manaregenicon.png")
-        self.stat_box(self.stat_box_x + 4*STAT_BOX_SIZE + 20, 660, "Magic Power", "img/staticons/strenghticon.png")
-        self.stat_box(self.stat_box_x + 5*STAT_BOX_SIZE + 25, 660, "Speed", "img/staticons/speedicon.png")
-
-        self.mouse_clicked = pygame.mouse.get_pressed()[0]
-        # sprawdzamy czy mamy ability points, jeżeli tak
-        # to sprawdzmy czy dana umiejętność nie osiągnał maks. poziomu
-        # jeżeli nie, to rysujemy nad nim upgrade_box()
-        if player.ability_points > 0:
-            if player.stats['health'] < player.max_stats['health']:
-                self.upgrade_box((self.stat_box_x + 6, 625), 'health', player)
-            if player.stats['health_regen'] < player.max_stats['health_regen']:
-                self.upgrade_box((self.stat_box_x + STAT_BOX_SIZE + 13, 625), 'health_regen', player)
-            if player.stats['mana'] < player.max_stats['mana']:
-                self.upgrade_box((self.stat_box_x + 2*STAT_BOX_SIZE + 18, 625), 'mana', player)
-            if player.stats['mana_regen'] < player.max_stats['mana_regen']:
-                self.upgrade_box((self.stat_box_x + 3*STAT_BOX_SIZE + 23, 625), 'mana_regen', player)
-            if player.stats['magic'] < player.max_stats['magic']:
-                self.upgrade_box((self.stat_box_x + 4*STAT_BOX_SIZE + 28, 625), 'magic', player)
-            if player.stats['speed'] < player.max_stats['speed']:
-                self.upgrade_box((self.stat_box_x + 5*STAT_BOX_SIZE + 33, 625), 'speed', player)
-        self.mouse_was_pressed = self.mouse_clicked
+        self.update_hud(player)
+        self.display_surface.blits(self.blit_sequence, doreturn=False)
+        self.upgrade_click(player)
 
 
 class Menu:
@@ -175,23 +220,51 @@ class Menu:
         self.box_width = 300
         self.box_height = 60
 
-        self.bg = pygame.image.load("img/assets/menu.png")
-        self.bg = pygame.transform.scale(self.bg, (WIDTH, HEIGTH))
+        self.bg = assets.image("img/assets/menu.png")
         self.text_color = '#fc4f53'
 
         self.display_surface = pygame.display.get_surface()
-        self.font = pygame.font.Font(UI_FONT, 34)
+        self.font = assets.load_font(UI_FONT, 34)
         self.x = 490
         self.y = 240
 
-    def menu_box(self, text: str, x, y, events):
+        # stan podświetlenia przycisków z poprzedniej klatki, klucz: napis
+        self.hovered = {}
+        # przyciski menu, klucz: napis, wartość: pozycja
+        self.buttons = {}
+        # stan ekranu z ostatniego rysowania (menu rysujemy tylko po zmianie)
+        self.drawn_state = None
+
+    def button_rect(self, text):
+        x, y = self.buttons[text]
+        return pygame.Rect(x+10, y, self.box_width-20, self.box_height)
+
+    def state(self):
+        """To, od czego zależy wygląd menu: które przyciski są podświetlone"""
+        mouse = pygame.mouse.get_pos()
+        return tuple(self.button_rect(text).collidepoint(mouse) for text in self.buttons)
+
+    def changed(self):
+        return self.state() != self.drawn_state
+
+    def draw_buttons(self):
+        for text, (x, y) in self.buttons.items():
+            self.menu_box(text, x, y)
+        self.drawn_state = self.state()
+
+    def menu_box(self, text: str, x, y):
         bg_rect = pygame.Rect(x+10, y, self.box_width-20, self.box_height)
 
-        if bg_rect.collidepoint(pygame.mouse.get_pos()):
-            text = self.font.render(text, True, 'white')
+        hovered = bg_rect.collidepoint(pygame.mouse.get_pos())
+        if self.hovered.get(text) != hovered:
+            dirty_rects.add(bg_rect)
+            self.hovered[text] = hovered
+
+        if hovered:
+            text = text_cache.render(self.font, text, True, 'white')
             pygame.draw.rect(self.display_surface, self.text_color, bg_rect)
         else:
-            text = self.font.render(text, True, self.text_color)
+            text = text_cache.render(self.font, text, True, self.text_color)
             pygame.draw.rect(self.display_surface, self.text_color, bg_rect, 3)
 
         text_rect = text.get_rect(center=bg_rect.center)
@@ -211,6 +284,11 @@ class StartMenu(Menu):
         self.username = 'Username'
         self.can_write = True
         self.username_input = pygame.Rect(self.x, self.y, self.box_width, self.box_height)
+        # ostatnio narysowany stan pola tekstowego i zajmowany przez nie obszar
+        self.input_state = None
+        self.input_rect = self.username_input
+
+        self.buttons = {"Start": (self.x, self.y+80), "Settings": (self.x, self.y+220), "Quit": (self.x, self.y+300)}
 
     def get_input(self, input_box, events):
         for event in events:
@@ -235,31 +313,42 @@ class StartMenu(Menu):
                         if self.can_write:
                             self.username += event.unicode
 
-        txt_surface = self.font.render(self.username, True, self.color)
+    def draw_input(self, input_box):
+        txt_surface = text_cache.render(self.font, self.username, True, self.color)
         txt_rect = txt_surface.get_rect(center=input_box.center)
         self.display_surface.blit(txt_surface, txt_rect)
         pygame.draw.rect(self.display_surface, self.color, input_box, 2, 15)
 
+        # pole zmienia się tylko po wpisaniu znaku albo kliknięciu
+        if self.input_state != (self.username, self.color):
+            dirty_rects.add(self.input_rect)
+            self.input_rect = input_box.union(txt_rect)
+            dirty_rects.add(self.input_rect)
+            self.input_state = (self.username, self.color)
+
         if txt_rect.width >= input_box.width-30:
             self.can_write = False
         else:
             self.can_write = True
 
 
-    def display(self, events):
-        self.display_surface.blit(self.bg, (0,0))
+    def state(self):
+        return super().state() + (self.username, self.color)
 
+    def handle(self, events):
         self.get_input(self.username_input, events)
-        start_button = self.menu_box("Start", self.x,self.y+80, events)
-        settings_button = self.menu_box("Settings", self.x, self.y+220, events)
-        quit_button = self.menu_box("Quit", self.x, self.y+300, events)
 
         for event in events:
             if event.type == pygame.MOUSEBUTTONDOWN:
-                if start_button.collidepoint(event.pos) and len(self.username) >= 3:
+                if self.button_rect("Start").collidepoint(event.pos) and len(self.username) >= 3:
                     return True
-                elif quit_button.collidepoint(event.pos):
-                    sys.exit()
+                elif self.button_rect("Quit").collidepoint(event.pos):
+                    quit_game()
+
+    def draw(self):
+        self.display_surface.blit(self.bg, (0,0))
+        self.draw_input(self.username_input)
+        self.draw_buttons()
     
 
 
@@ -268,16 +357,17 @@ class EndMenu(Menu):
     """Klasa odpowiedzialna za rysowanie menu końcowego."""
     def __init__(self) -> None:
         super().__init__()
+        self.buttons = {"Try Again": (self.x, self.y+100), "Quit": (self.x, self.y+250)}
 
-    def display(self, events):
-        self.display_surface.blit(self.bg, (0,0))
-        try_again = self.menu_box("Try Again", self.x,self.y+100, events)
-        quit_button = self.menu_box("Quit", self.x, self.y+250, events)
-
+    def handle(self, events):
         for event in events:
             if event.type == pygame.MOUSEBUTTONDOWN:
-                if try_again.collidepoint(event.pos):
+                if self.button_rect("Try Again").collidepoint(event.pos):
                     return True
-                elif quit_button.collidepoint(event.pos):
-                    sys.exit()
+                elif self.button_rect("Quit").collidepoint(event.pos):
+                    quit_game()
+
+    def draw(self):
+        self.display_surface.blit(self.bg, (0,0))
+        self.draw_buttons()
         
\ No newline at end of file
@@ -0,0 +1,23 @@
+import pygame
+
+class WindowState:
+    """Śledzi, czy okno gry ma fokus i czy jest widoczne (zdarzenia WINDOW* z pygame 2)"""
+
+    def __init__(self) -> None:
+        self.focused = True
+        self.visible = True
+
+    def handle(self, event):
+        if event.type == pygame.WINDOWFOCUSLOST:
+            self.focused = False
+        elif event.type == pygame.WINDOWFOCUSGAINED:
+            self.focused = True
+        elif event.type in (pygame.WINDOWMINIMIZED, pygame.WINDOWHIDDEN):
+            self.visible = False
+        elif event.type in (pygame.WINDOWRESTORED, pygame.WINDOWMAXIMIZED, pygame.WINDOWSHOWN, pygame.WINDOWEXPOSED):
+            self.visible = True
+
+    @property
+    def background(self):
+        """Czy gracz nie patrzy na grę (okno bez fokusu albo niewidoczne)"""
+        return not (self.focused and self.visible)